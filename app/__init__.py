@@ -1,10 +1,42 @@
 from flask import Flask
 from dotenv import load_dotenv
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Background listener that writes log records queued by request handlers, started once per process
+_log_listener = None
+
+
+def _configure_logging():
+    """
+    Moves log output off the request path.
+
+    The handlers configured on the root logger (or a stream handler if there are none) are moved behind a
+    QueueHandler, so logging in a request only enqueues the record and a background thread does the
+    formatting and writing.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    root = logging.getLogger()
+    handlers = root.handlers[:] or [logging.StreamHandler()]
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    # Flush the remaining records when the process exits
+    atexit.register(_log_listener.stop)
+
 
 def create_app():
     # Initialize the Flask app with instance-relative config
@@ -22,4 +54,7 @@ def create_app():
 
         app.register_blueprint(routes.bp)
 
+    # Configured after the routes are imported so the handlers set up by the modules' basicConfig are queued too
+    _configure_logging()
+
     return app
@@ -1,9 +1,13 @@
+import base64
+import binascii
 import logging
 from flask import Blueprint, request, jsonify
 from flask_cors import CORS
 import os
 import tempfile
 import shutil
+import uuid
+from datetime import datetime
 from modules.database import database as db
 from modules.database.database import (
     PaperNotFoundError,
@@ -172,6 +176,38 @@ def get_paper_references(paper_id):
         return jsonify({"error": str(e)}), 500
 
 
+def _encode_cursor(cursor):
+    """Serialize a (created_at, id) pagination cursor into an opaque URL-safe token, keeping full timestamp precision."""
+    if not cursor:
+        return None
+    created_at, paper_id = cursor
+    token = base64.urlsafe_b64encode(f"{created_at.isoformat()},{paper_id}".encode())
+    return token.rstrip(b"=").decode("ascii")
+
+
+def _decode_cursor(value):
+    """
+    Parse a token produced by `_encode_cursor`.
+
+    Returns:
+        The (created_at, id) pair, or None if no cursor was given
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).decode()
+        created_at, paper_id = raw.rsplit(",", 1)
+        # Paper ids are UUIDs; anything else would only fail later when the database casts it
+        uuid.UUID(paper_id)
+        return datetime.fromisoformat(created_at), paper_id
+    except (binascii.Error, ValueError):
+        logger.warning("Invalid pagination cursor: %s", value)
+        raise ValueError("Invalid pagination cursor") from None
+
+
 @bp.route("/papers", methods=["GET"])
 def list_papers():
     """
@@ -181,6 +217,9 @@ def list_papers():
         query (str): Optional search query to find similar papers
         page (int): Page number for pagination (default: 1)
         page_size (int): Number of papers per page (default: 10)
+        cursor (str): Optional `next_cursor` of the previous page, continues the listing right after it.
+                      Such pages are not counted, so their `total` and `total_pages` are null.
+                      An invalid cursor is rejected with 400.
 
     Returns:
         JSON with papers list and pagination metadata
@@ -193,6 +232,10 @@ def list_papers():
     except ValueError:
         page = 1
         page_size = 10
+    try:
+        cursor = _decode_cursor(request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     try:
         if query:
@@ -218,8 +261,8 @@ def list_papers():
             return jsonify({"papers": formatted_papers, "total": len(formatted_papers), "page": 1, "total_pages": 1})
         else:
             # Get paginated list of all papers
-            result = db.paper_list_all(page=page, page_size=page_size)
-            return jsonify(result)
+            result = db.paper_list_all(page=page, page_size=page_size, cursor=cursor)
+            return jsonify({**result, "next_cursor": _encode_cursor(result.get("next_cursor"))})
 
     except EmbeddingNotFoundError as e:
         return jsonify({"error": str(e)}), 404
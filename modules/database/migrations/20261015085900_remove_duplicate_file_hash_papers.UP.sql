@@ -0,0 +1,55 @@
+-- Remove duplicate papers left by the old SELECT-then-INSERT duplicate check, so that the unique constraint on
+-- file_hash added by the next migration can be created. The oldest paper per file hash is kept and rows pointing
+-- at a duplicate are moved to it. The duplicates' files in object storage are not removed.
+CREATE TEMPORARY TABLE duplicate_file_hash_papers ON COMMIT DROP AS
+SELECT id, keep_id, copy_rank
+FROM (
+    SELECT id,
+           first_value(id) OVER (PARTITION BY file_hash ORDER BY created_at, id) AS keep_id,
+           row_number() OVER (PARTITION BY file_hash ORDER BY created_at, id) AS copy_rank,
+           count(*) OVER (PARTITION BY file_hash) AS copies
+    FROM papers
+) grouped
+WHERE copies > 1;
+
+-- References of other papers now point to the kept paper
+UPDATE paper_references pr
+SET reference_paper_id = d.keep_id
+FROM duplicate_file_hash_papers d
+WHERE pr.reference_paper_id = d.id
+  AND d.id <> d.keep_id;
+
+-- Each copy holds the same references and embeddings, so only those of the oldest copy that has any are kept,
+-- moved to the kept paper if it has none of its own
+UPDATE paper_references pr
+SET paper_id = s.keep_id
+FROM (
+    SELECT DISTINCT ON (d.keep_id) d.id, d.keep_id
+    FROM duplicate_file_hash_papers d
+    WHERE EXISTS (SELECT 1 FROM paper_references r WHERE r.paper_id = d.id)
+    ORDER BY d.keep_id, d.copy_rank
+) s
+WHERE pr.paper_id = s.id
+  AND s.id <> s.keep_id;
+
+UPDATE paper_embeddings pe
+SET paper_id = s.keep_id
+FROM (
+    SELECT DISTINCT ON (d.keep_id) d.id, d.keep_id
+    FROM duplicate_file_hash_papers d
+    WHERE EXISTS (SELECT 1 FROM paper_embeddings e WHERE e.paper_id = d.id)
+    ORDER BY d.keep_id, d.copy_rank
+) s
+WHERE pe.paper_id = s.id
+  AND s.id <> s.keep_id;
+
+-- Drop what is left of the duplicates; their embeddings are removed by the cascading foreign key
+DELETE FROM paper_references pr
+USING duplicate_file_hash_papers d
+WHERE pr.paper_id = d.id
+  AND d.id <> d.keep_id;
+
+DELETE FROM papers p
+USING duplicate_file_hash_papers d
+WHERE p.id = d.id
+  AND d.id <> d.keep_id;
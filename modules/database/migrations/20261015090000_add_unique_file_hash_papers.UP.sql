@@ -0,0 +1,3 @@
+-- Enforce one paper per file hash so duplicate uploads can be detected atomically on insert
+ALTER TABLE papers
+ADD CONSTRAINT papers_file_hash_unique UNIQUE (file_hash);
@@ -0,0 +1,11 @@
+-- Let deleting a paper remove its references server-side
+ALTER TABLE paper_references
+DROP CONSTRAINT paper_references_paper_id_fkey,
+ADD CONSTRAINT paper_references_paper_id_fkey
+    FOREIGN KEY (paper_id) REFERENCES papers (id) ON DELETE CASCADE;
+
+-- Keep references of other papers when the paper they point to is deleted
+ALTER TABLE paper_references
+DROP CONSTRAINT paper_references_reference_paper_id_fkey,
+ADD CONSTRAINT paper_references_reference_paper_id_fkey
+    FOREIGN KEY (reference_paper_id) REFERENCES papers (id) ON DELETE SET NULL;
@@ -0,0 +1,3 @@
+-- Index matching the paper listing order so pages can be read without sorting the whole table
+CREATE INDEX CONCURRENTLY IF NOT EXISTS papers_created_at_id_idx
+ON papers (created_at DESC, id DESC);
@@ -0,0 +1,15 @@
+-- Store embeddings as half-precision vectors to halve the size of the table and its HNSW index.
+-- The generated hash column and the constraint using it depend on the column type, so they are recreated.
+ALTER TABLE paper_embeddings DROP CONSTRAINT paper_embeddings_unique_combination;
+ALTER TABLE paper_embeddings DROP COLUMN embedding_hash;
+
+-- The existing index is built on vector_cosine_ops and is replaced in the next migration
+DROP INDEX IF EXISTS paper_embeddings_embedding_hnsw_idx;
+
+ALTER TABLE paper_embeddings ALTER COLUMN embedding TYPE halfvec(1024) USING embedding::halfvec(1024);
+
+ALTER TABLE paper_embeddings ADD COLUMN embedding_hash TEXT
+    GENERATED ALWAYS AS (encode(sha256(embedding::text::bytea), 'hex')) STORED;
+
+ALTER TABLE paper_embeddings ADD CONSTRAINT paper_embeddings_unique_combination
+    UNIQUE (paper_id, model_name, model_version, embedding_hash);
@@ -0,0 +1,5 @@
+-- Recreate the HNSW index concurrently for the half-precision embeddings using cosine similarity
+CREATE INDEX CONCURRENTLY IF NOT EXISTS paper_embeddings_embedding_hnsw_idx
+ON paper_embeddings
+USING hnsw (embedding halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 200);
@@ -1,10 +1,49 @@
-import pandoc
+import functools
+import hashlib
 import os
 import logging
+import mmap
+import stat
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterator, Optional
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Directory for converted Markdown, keyed by the LaTeX sources and the pandoc version; off if empty
+LATEX_PARSER_CACHE = os.getenv("LATEX_PARSER_CACHE", "")
+
+PANDOC_OPTIONS = ["--from", "latex", "--to", "markdown", "--wrap=none"]
+
+# The main tex file is the one that opens the document environment
+_DOC_MARKER = rb"\begin{document}"
+# Candidate files checked one after another before the remaining ones are read concurrently
+_SERIAL_SCAN_FILES = 4
+_SCAN_WORKERS = 8
+
+# Main tex files found recently, keyed by (directory, inode, mtime), least recently used first. A directory's
+# mtime changes whenever entries are added, removed or renamed in it, so a changed tree is searched again.
+_MAIN_TEX_CACHE_SIZE = 64
+_MAIN_TEX_CACHE: OrderedDict = OrderedDict()
+_MAIN_TEX_CACHE_LOCK = threading.Lock()
+
+# Build output and tool directories of LaTeX projects; hidden directories such as .git are skipped as well
+_SKIPPED_DIRS = frozenset({"build", "auto", "out"})
+
+# File names that usually hold the main document, checked before the other .tex files of a directory
+_LIKELY_MAIN_NAMES = frozenset({"main.tex", "paper.tex", "ms.tex", "article.tex", "root.tex"})
+
+
+class PandocError(Exception):
+    """Raised when pandoc fails to convert a LaTeX document or is not installed."""
+
+    pass
+
 
 def parse_latex_to_markdown(path: str) -> str:
     """
@@ -19,11 +58,18 @@ def parse_latex_to_markdown(path: str) -> str:
 
     Raises:
         FileNotFoundError: If no main tex file is found in the directory
-        pandoc.PandocError: If Pandoc conversion fails
-        OSError: If changing directory or file access fails
+        PandocError: If Pandoc conversion fails
+        OSError: If file access fails
     """
+    # A single stat tells both whether the path exists and whether it is a directory
+    try:
+        path_stat = os.stat(path)
+    except FileNotFoundError:
+        logger.error(f"File does not exist: {path}")
+        raise FileNotFoundError(f"File does not exist: {path}") from None
+
     # Check if input is a directory
-    if os.path.isdir(path):
+    if stat.S_ISDIR(path_stat.st_mode):
         logger.debug(f"Finding main tex file in directory: {path}")
         file_path = find_main_tex_file(path)
         if file_path is None:
@@ -32,45 +78,137 @@ def parse_latex_to_markdown(path: str) -> str:
         logger.info(f"Found main tex file: {file_path}")
     else:
         file_path = path
-        if not os.path.exists(file_path):
-            logger.error(f"File does not exist: {file_path}")
-            raise FileNotFoundError(f"File does not exist: {file_path}")
 
     # Get absolute path and directory of the input file
     abs_path = os.path.abspath(file_path)
     working_dir = os.path.dirname(abs_path)
 
-    # Store current directory
-    original_dir = os.getcwd()
-
-    try:
-        # Change to the LaTeX file's directory
-        logger.debug(f"Changing to directory: {working_dir}")
-        os.chdir(working_dir)
-
-        # Convert LaTeX to Markdown using the file name only
+    cache_key = None
+    if LATEX_PARSER_CACHE:
         try:
-            logger.debug(f"Converting {os.path.basename(abs_path)} from LaTeX to Markdown")
-            doc = pandoc.read(file=os.path.basename(abs_path), format="latex")
-            markdown_content = pandoc.write(doc, format="markdown")
-            logger.info(f"Successfully converted {os.path.basename(abs_path)} to Markdown")
+            cache_key = _markdown_cache_key(abs_path)
+        except OSError as e:
+            logger.warning(f"Could not read the sources of {abs_path} for the Markdown cache: {str(e)}")
+        markdown_content = _markdown_cache_get(cache_key) if cache_key is not None else None
+        if markdown_content is not None:
+            logger.info(f"Using cached Markdown for {os.path.basename(abs_path)}")
             return markdown_content
-        except Exception as e:
-            logger.error(f"Pandoc conversion failed: {str(e)}")
-            raise
+
+    # Convert LaTeX to Markdown using the file name only, with pandoc run in the file's directory so relative
+    # \input and \include paths resolve. The working directory is passed to the subprocess instead of changing
+    # the process-wide one, so concurrent conversions do not interfere. pandoc is run once, directly from LaTeX
+    # to Markdown, instead of through the pandoc package, which probes the pandoc version and round-trips the
+    # document through its JSON AST in separate pandoc processes. Paragraphs are not rewrapped to a fixed
+    # line width, the Markdown is stored for search and chunking rather than read as a text file.
+    try:
+        logger.debug(f"Converting {os.path.basename(abs_path)} from LaTeX to Markdown in {working_dir}")
+        result = subprocess.run(
+            ["pandoc", *PANDOC_OPTIONS, os.path.basename(abs_path)],
+            capture_output=True,
+            check=True,
+            cwd=working_dir,
+        )
+        markdown_content = result.stdout.decode("utf-8")
+        logger.info(f"Successfully converted {os.path.basename(abs_path)} to Markdown")
+        if cache_key is not None:
+            _markdown_cache_put(cache_key, markdown_content)
+        return markdown_content
+    except subprocess.CalledProcessError as e:
+        stderr = e.stderr.decode("utf-8", errors="replace").strip()
+        logger.error(f"Pandoc conversion failed: {stderr}")
+        raise PandocError(f"Pandoc conversion failed: {stderr}") from e
+    except FileNotFoundError as e:
+        logger.error("Pandoc is not installed")
+        raise PandocError("Pandoc is not installed") from e
     except Exception as e:
         logger.error(f"Error during LaTeX to Markdown conversion: {str(e)}")
         raise
-    finally:
-        # Always change back to original directory
-        logger.debug(f"Changing back to original directory: {original_dir}")
-        os.chdir(original_dir)
+
+
+@functools.lru_cache(maxsize=1)
+def _pandoc_version() -> str:
+    """
+    Returns the version line of the installed pandoc, so cached conversions are redone after an upgrade.
+
+    Returns:
+        str: The first line of `pandoc --version`, or "" if pandoc cannot be run
+    """
+    try:
+        result = subprocess.run(["pandoc", "--version"], capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return result.stdout.decode("utf-8", errors="replace").partition("\n")[0]
+
+
+def _markdown_cache_key(abs_path: str) -> str:
+    """
+    Builds the Markdown cache key for a main tex file.
+
+    The key covers the main file and every other .tex file below its directory, since those can be pulled in
+    with \\input or \\include, as well as the pandoc version and options.
+
+    Args:
+        abs_path (str): Absolute path to the main tex file
+
+    Returns:
+        str: A 128-bit BLAKE2b digest in hex
+
+    Raises:
+        OSError: If a source file cannot be read
+    """
+    working_dir = os.path.dirname(abs_path)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\0".join([_pandoc_version(), *PANDOC_OPTIONS, os.path.basename(abs_path)]).encode())
+    for relative_path in sorted(os.path.relpath(path, working_dir) for path in _iter_tex_files(working_dir)):
+        with open(os.path.join(working_dir, relative_path), "rb") as f:
+            digest.update(b"\0" + relative_path.encode() + b"\0")
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _markdown_cache_get(cache_key: str) -> Optional[str]:
+    """
+    Looks up converted Markdown in LATEX_PARSER_CACHE.
+
+    Args:
+        cache_key (str): The key built by _markdown_cache_key
+
+    Returns:
+        Optional[str]: The cached Markdown, or None if it is not cached
+    """
+    try:
+        with open(os.path.join(LATEX_PARSER_CACHE, f"{cache_key}.md"), encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Markdown cache lookup failed: {str(e)}")
+        return None
+
+
+def _markdown_cache_put(cache_key: str, markdown_content: str) -> None:
+    """
+    Stores converted Markdown in LATEX_PARSER_CACHE. The file is written under a temporary name and then
+    renamed, so concurrent readers never see a partial file.
+
+    Args:
+        cache_key (str): The key built by _markdown_cache_key
+        markdown_content (str): The Markdown to store
+    """
+    try:
+        os.makedirs(LATEX_PARSER_CACHE, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=LATEX_PARSER_CACHE, suffix=".tmp", delete=False) as f:
+            f.write(markdown_content)
+        os.replace(f.name, os.path.join(LATEX_PARSER_CACHE, f"{cache_key}.md"))
+    except OSError as e:
+        logger.warning(f"Failed to write Markdown cache: {str(e)}")
 
 
 def find_main_tex_file(directory: str) -> str:
     """
     Find the main .tex file in the given directory by looking for \begin{document}.
-    Searches through the current directory and all subdirectories.
+    Searches through the current directory and all subdirectories, except hidden directories
+    and LaTeX build directories.
 
     Args:
         directory (str): The directory to search in
@@ -81,29 +219,178 @@ def find_main_tex_file(directory: str) -> str:
     Note:
         The function identifies the main tex file by searching for '\begin{document}'
         in the file content, which is a standard indicator of the main LaTeX document.
+        Results are cached until entries of the directory itself change.
+    """
+    try:
+        dir_stat = os.stat(directory)
+        cache_key = (os.path.abspath(directory), dir_stat.st_ino, dir_stat.st_mtime_ns)
+    except OSError:
+        cache_key = None
+    if cache_key is not None:
+        with _MAIN_TEX_CACHE_LOCK:
+            file_path = _MAIN_TEX_CACHE.get(cache_key)
+            if file_path is not None:
+                _MAIN_TEX_CACHE.move_to_end(cache_key)
+        if file_path is not None and os.path.isfile(file_path):
+            logger.debug(f"Using cached main tex file: {file_path}")
+            return file_path
+
+    file_path = _search_main_tex_file(directory)
+    # Only hits are cached, as a file changed to add \begin{document} would not change the directory's mtime
+    if file_path is not None and cache_key is not None:
+        with _MAIN_TEX_CACHE_LOCK:
+            _MAIN_TEX_CACHE[cache_key] = file_path
+            _MAIN_TEX_CACHE.move_to_end(cache_key)
+            while len(_MAIN_TEX_CACHE) > _MAIN_TEX_CACHE_SIZE:
+                _MAIN_TEX_CACHE.popitem(last=False)
+    return file_path
+
+
+def _search_main_tex_file(directory: str) -> Optional[str]:
+    """
+    Searches the tree below a directory for the main tex file, see find_main_tex_file.
+
+    Args:
+        directory (str): The directory to search in
+
+    Returns:
+        Optional[str]: Path to the main tex file, or None if not found
     """
     logger.debug(f"Searching for main tex file in {directory}")
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith(".tex"):
-                file_path = os.path.join(root, file)
-                try:
-                    logger.debug(f"Checking file: {file_path}")
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        content = f.read()
-                        if r"\begin{document}" in content:
-                            logger.info(f"Found main tex file: {file_path}")
-                            return file_path
-                except UnicodeDecodeError:
-                    logger.warning(f"Unicode decode error in file: {file_path}")
-                    continue
-                except IOError as e:
-                    logger.warning(f"IO error reading file {file_path}: {str(e)}")
-                    continue
+    candidates = _iter_tex_files(directory)
+
+    # The main file is usually among the first candidates, so these are checked one by one without listing the rest
+    for file_path in islice(candidates, _SERIAL_SCAN_FILES):
+        if _is_main_tex_file(file_path):
+            logger.info(f"Found main tex file: {file_path}")
+            return file_path
+
+    # Otherwise the remaining files are read concurrently, reading files is blocking I/O that releases the GIL.
+    # Results are still taken in candidate order, so the outcome does not depend on which read finishes first.
+    remaining = list(candidates)
+    if remaining:
+        with ThreadPoolExecutor(max_workers=min(_SCAN_WORKERS, len(remaining))) as executor:
+            for file_path, is_main in zip(remaining, executor.map(_is_main_tex_file, remaining), strict=True):
+                if is_main:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    logger.info(f"Found main tex file: {file_path}")
+                    return file_path
+
     logger.warning(f"No main tex file found in directory: {directory}")
     return None
 
 
+def _is_main_tex_file(file_path: str) -> bool:
+    """
+    Checks whether a tex file is a main file, treating unreadable files as not main.
+    Files that are not valid UTF-8 are skipped as well, as pandoc reads its input as UTF-8, so the search
+    moves on to the next candidate.
+
+    Args:
+        file_path (str): The file to check
+
+    Returns:
+        bool: True if the file contains \\begin{document} and is valid UTF-8
+    """
+    try:
+        logger.debug(f"Checking file: {file_path}")
+        if not _contains_doc_marker(file_path):
+            return False
+        # The marker scan works on bytes, so the encoding is only checked for the file that matched
+        if not _is_utf8(file_path):
+            logger.warning(f"Unicode decode error in file: {file_path}")
+            return False
+        return True
+    except OSError as e:
+        logger.warning(f"IO error reading file {file_path}: {str(e)}")
+        return False
+
+
+def _iter_tex_files(directory: str) -> Iterator[str]:
+    """
+    Yields the .tex files below a directory, the files of a directory before those of its subdirectories.
+    Within a directory, the usual names of a main file and a file named after the top-level directory come first,
+    so the main file of a typical arXiv source tree is the first one opened.
+
+    Directory entries are classified from the type scandir reports with them, so no file is stat'ed.
+    Hidden directories, LaTeX build directories and symlinked directories are not descended into.
+    The walk is lazy, so a caller that stops at the first match does not list the rest of the tree.
+
+    Args:
+        directory (str): The directory to search in
+
+    Returns:
+        Iterator[str]: Paths of the .tex files
+    """
+    likely_names = _LIKELY_MAIN_NAMES | {os.path.basename(os.path.normpath(directory)) + ".tex"}
+    stack = [directory]
+    while stack:
+        dirpath = stack.pop()
+        subdirs = []
+        tex_files = []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith((".", "_minted")) and entry.name not in _SKIPPED_DIRS:
+                            subdirs.append(entry.path)
+                    elif entry.name.endswith(".tex"):
+                        tex_files.append(entry)
+        except OSError as e:
+            logger.warning(f"IO error listing directory {dirpath}: {str(e)}")
+            continue
+        tex_files.sort(key=lambda entry: entry.name not in likely_names)
+        yield from (entry.path for entry in tex_files)
+        # Reversed, so subdirectories are searched in listing order
+        stack.extend(reversed(subdirs))
+
+
+def _contains_doc_marker(file_path: str) -> bool:
+    """
+    Checks whether a file contains \\begin{document}.
+
+    The file is memory-mapped and searched as bytes, so it is neither decoded nor copied into the process, and
+    the search stops at the first match, usually in the preamble. This also finds the marker in files that are
+    not valid UTF-8.
+
+    Args:
+        file_path (str): The file to scan
+
+    Returns:
+        bool: True if the file contains the marker
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(file_path, "rb") as f:
+        # Empty files cannot be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped.find(_DOC_MARKER) != -1
+
+
+def _is_utf8(file_path: str) -> bool:
+    """
+    Checks whether a file is valid UTF-8.
+
+    Args:
+        file_path (str): The file to check
+
+    Returns:
+        bool: True if the whole file decodes as UTF-8
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(file_path, "rb") as f:
+        try:
+            f.read().decode("utf-8")
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
 if __name__ == "__main__":
     # Configure logging for script execution
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
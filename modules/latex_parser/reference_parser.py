@@ -126,6 +126,125 @@ class ReferenceParser:
     # Captures the optional label, citation key, and content
     BIBITEM_PATTERN = re.compile(r"\\bibitem(?:\[(.*?)\])?\{(.*?)\}(.*?)(?=\\bibitem|\\end\{thebibliography\}|\Z)", re.DOTALL)
 
+    # Heuristics for unstructured \bibitem content, compiled once instead of on every entry.
+    # Patterns in a tuple are tried in order until one matches.
+    JOURNAL_PATTERNS = tuple(
+        re.compile(pattern)
+        for pattern in (
+            r"\\textit{([^}]+)}",  # \textit{journal}
+            r"\\emph{([^}]+)}",  # \emph{journal}
+            r"{\\em\s+([^}]+)}",  # {\em journal}
+            r"\\em\s+([^,\.]+)",  # \em journal
+            r"In\s+{\\\w+\s+([^}]+)}",  # In {\xx journal}
+            r"In\s+\\textit{([^}]+)}",  # In \textit{journal}
+            r'In\s*[\'"]([^\'"]*)[\'"]\.*',  # In "journal"
+            r"(?:In |in ){\\it ([^}]+)}",  # In {\it journal}
+            r"(?<=\.)[ \t]+([A-Z][^,\.]*(?:Journal|Proceedings|Transactions|Review|Letters)[^,\.]*)",  # journal name
+        )
+    )
+    BOOKTITLE_PATTERNS = tuple(
+        re.compile(pattern)
+        for pattern in (
+            r"In\s+(?:proceedings\s+of|proc\.\s+of|Proc\.\s+of)\s+the\s+([^,\.]+)",  # In proceedings of the CONF
+            r"In\s+([^,\.]*(?:Conference|Symposium|Workshop)[^,\.]*)",  # In XYZ Conference
+        )
+    )
+    PUBLISHER_PATTERNS = tuple(
+        re.compile(pattern)
+        for pattern in (
+            r"(?:publisher|Publisher)[\s=:]+([^,\.]+)",  # publisher: XYZ
+            r"([^,\.]+?(?:Press|Publishers|Publishing))",  # XYZ Press
+        )
+    )
+    ADDRESS_PATTERNS = tuple(
+        re.compile(pattern)
+        for pattern in (
+            r"address\s*[=:]\s*([^,\.]+)",  # address: XYZ
+            r"([A-Z][a-zA-Z]+,\s+[A-Z]{2,})",  # City, STATE
+            r"([A-Z][a-zA-Z]+,\s+[A-Z][a-zA-Z]+)",  # City, Country
+        )
+    )
+    YEAR_PATTERN = re.compile(r"\b(19|20)\d{2}\b")
+    VOLUME_PATTERN = re.compile(r"volume\s*[=:]*\s*(\d+)|Vol\.\s*(\d+)|volume\s+(\d+)", re.IGNORECASE)
+    NUMBER_PATTERN = re.compile(r"number\s*[=:]*\s*(\d+)|No\.\s*(\d+)|issue\s+(\d+)|issue\s*[=:]*\s*(\d+)", re.IGNORECASE)
+    PAGES_PATTERN = re.compile(r"pages\s*[=:]*\s*([\d\-–—]+)|pp\.\s*([\d\-–—]+)", re.IGNORECASE)
+    DOI_PATTERNS = (re.compile(r"doi\s*[:=]\s*([^\s,]+)", re.IGNORECASE), re.compile(r"https?://(?:dx\.)?doi\.org/([^\s,]+)"))
+    URL_PATTERNS = (re.compile(r"\\url{([^}]+)}"), re.compile(r"https?://[^\s,}]+"))
+    ARXIV_PATTERNS = (re.compile(r"arXiv:([^\s,}]+)"), re.compile(r"https?://arxiv\.org/abs/([^\s,}]+)"))
+    BOOK_PATTERN = re.compile(r"\\textit{([^}]*book[^}]*)}", re.IGNORECASE)
+
+    # Common LaTeX escape sequences and their replacements
+    LATEX_ESCAPES = {
+        "\\&": "&",
+        '\\"a': "ä",
+        '\\"A': "Ä",
+        '\\"o': "ö",
+        '\\"O': "Ö",
+        '\\"u': "ü",
+        '\\"U': "Ü",
+        "\\`a": "à",
+        "\\`A": "À",
+        "\\'e": "é",
+        "\\'E": "É",
+        "\\'a": "á",
+        "\\'A": "Á",
+        "\\'o": "ó",
+        "\\'O": "Ó",
+        "\\'u": "ú",
+        "\\'U": "Ú",
+        "\\'i": "í",
+        "\\'I": "Í",
+        "\\'{e}": "é",
+        "\\'{E}": "É",
+        "\\c{c}": "ç",
+        "\\c{C}": "Ç",
+        "\\~a": "ã",
+        "\\~A": "Ã",
+        "\\~n": "ñ",
+        "\\~N": "Ñ",
+        "\\ss": "ß",
+        "\\ae": "æ",
+        "\\AE": "Æ",
+        "\\oe": "œ",
+        "\\OE": "Œ",
+        "\\textbackslash": "\\",
+        "\\textgreater": ">",
+        "\\textless": "<",
+        "\\$": "$",
+        "\\%": "%",
+        "\\_": "_",
+        "\\#": "#",
+        # Greek letter replacements for math mode
+        "\\alpha": "alpha",
+        "\\beta": "beta",
+        "\\gamma": "gamma",
+        "\\delta": "delta",
+        "\\epsilon": "epsilon",
+        "\\zeta": "zeta",
+        "\\eta": "eta",
+        "\\theta": "theta",
+        "\\iota": "iota",
+        "\\kappa": "kappa",
+        "\\lambda": "lambda",
+        "\\mu": "mu",
+        "\\nu": "nu",
+        "\\xi": "xi",
+        "\\pi": "pi",
+        "\\rho": "rho",
+        "\\sigma": "sigma",
+        "\\tau": "tau",
+        "\\upsilon": "upsilon",
+        "\\phi": "phi",
+        "\\chi": "chi",
+        "\\psi": "psi",
+        "\\omega": "omega",
+    }
+
+    # LaTeX markup removed from BibTeX values: \"{x} accents, $math$ delimiters and grouping braces
+    UMLAUT_PATTERN = re.compile(r"\\\"{\s*([aouiAOUI])\s*}")
+    MATH_PATTERN = re.compile(r"\$([^$]+)\$")
+    BRACES_PATTERN = re.compile(r"{([^{}]*)}")
+
     def __init__(self):
         """Initialize the parser with an empty dictionary of entries."""
         # Dictionary to store entries by their ID for deduplication
@@ -285,8 +404,8 @@ class ReferenceParser:
         # Store the raw text (normalized)
         fields["raw_text"] = content.replace("\n", " ").replace("  ", " ").strip()
 
-        # Split by newlines and remove empty lines
-        lines = [line.strip() for line in content.split("\n") if line.strip()]
+        # Split into lines, stripping each once and dropping empty ones
+        lines = [stripped for line in content.splitlines() if (stripped := line.strip())]
 
         if not lines:
             return fields
@@ -302,104 +421,76 @@ class ReferenceParser:
             fields["title"] = title_line.rstrip(".")
 
         # Extract journal/booktitle information using various patterns
-        journal_patterns = [
-            r"\\textit{([^}]+)}",  # \textit{journal}
-            r"\\emph{([^}]+)}",  # \emph{journal}
-            r"{\\em\s+([^}]+)}",  # {\em journal}
-            r"\\em\s+([^,\.]+)",  # \em journal
-            r"In\s+{\\\w+\s+([^}]+)}",  # In {\xx journal}
-            r"In\s+\\textit{([^}]+)}",  # In \textit{journal}
-            r'In\s*[\'"]([^\'"]*)[\'"]\.*',  # In "journal"
-            r"(?:In |in ){\\it ([^}]+)}",  # In {\it journal}
-            r"(?<=\.)[ \t]+([A-Z][^,\.]*(?:Journal|Proceedings|Transactions|Review|Letters)[^,\.]*)",  # journal name
-        ]
-
         # Try each pattern until we find a match
-        for pattern in journal_patterns:
-            match = re.search(pattern, content)
+        for pattern in self.JOURNAL_PATTERNS:
+            match = pattern.search(content)
             if match:
                 fields["journal"] = match.group(1).strip()
                 break
 
         # Extract booktitle for conference papers
-        booktitle_patterns = [
-            r"In\s+(?:proceedings\s+of|proc\.\s+of|Proc\.\s+of)\s+the\s+([^,\.]+)",  # In proceedings of the CONF
-            r"In\s+([^,\.]*(?:Conference|Symposium|Workshop)[^,\.]*)",  # In XYZ Conference
-        ]
-
         # Try each pattern if journal wasn't found
-        for pattern in booktitle_patterns:
-            match = re.search(pattern, content)
+        for pattern in self.BOOKTITLE_PATTERNS:
+            match = pattern.search(content)
             if match and "journal" not in fields:
                 fields["booktitle"] = match.group(1).strip()
                 break
 
         # Extract publisher
-        publisher_patterns = [
-            r"(?:publisher|Publisher)[\s=:]+([^,\.]+)",  # publisher: XYZ
-            r"([^,\.]+?(?:Press|Publishers|Publishing))",  # XYZ Press
-        ]
-
-        for pattern in publisher_patterns:
-            match = re.search(pattern, content)
+        for pattern in self.PUBLISHER_PATTERNS:
+            match = pattern.search(content)
             if match:
                 fields["publisher"] = match.group(1).strip()
                 break
 
         # Try to extract year
-        year_match = re.search(r"\b(19|20)\d{2}\b", content)
+        year_match = self.YEAR_PATTERN.search(content)
         if year_match:
             fields["year"] = year_match.group(0)
 
         # Try to extract volume
-        volume_match = re.search(r"volume\s*[=:]*\s*(\d+)|Vol\.\s*(\d+)|volume\s+(\d+)", content, re.IGNORECASE)
+        volume_match = self.VOLUME_PATTERN.search(content)
         if volume_match:
             vol = volume_match.group(1) or volume_match.group(2) or volume_match.group(3)
             fields["volume"] = vol
 
         # Try to extract number/issue
-        number_match = re.search(r"number\s*[=:]*\s*(\d+)|No\.\s*(\d+)|issue\s+(\d+)|issue\s*[=:]*\s*(\d+)", content, re.IGNORECASE)
+        number_match = self.NUMBER_PATTERN.search(content)
         if number_match:
             num = next((g for g in number_match.groups() if g is not None), None)
             if num:
                 fields["number"] = num
 
         # Try to extract pages
-        pages_match = re.search(r"pages\s*[=:]*\s*([\d\-–—]+)|pp\.\s*([\d\-–—]+)", content, re.IGNORECASE)
+        pages_match = self.PAGES_PATTERN.search(content)
         if pages_match:
             pages = pages_match.group(1) or pages_match.group(2)
             fields["pages"] = pages.replace("–", "-").replace("—", "-")
 
         # Extract DOI if available
-        doi_match = re.search(r"doi\s*[:=]\s*([^\s,]+)", content, re.IGNORECASE) or re.search(r"https?://(?:dx\.)?doi\.org/([^\s,]+)", content)
+        doi_match = self.DOI_PATTERNS[0].search(content) or self.DOI_PATTERNS[1].search(content)
         if doi_match:
             fields["doi"] = doi_match.group(1).strip()
 
         # Extract URL if available
-        url_match = re.search(r"\\url{([^}]+)}", content) or re.search(r"https?://[^\s,}]+", content)
+        url_match = self.URL_PATTERNS[0].search(content) or self.URL_PATTERNS[1].search(content)
         if url_match:
             fields["url"] = url_match.group(1).strip() if "\\url{" in url_match.group(0) else url_match.group(0)
 
         # Extract arXiv identifier
-        arxiv_match = re.search(r"arXiv:([^\s,}]+)", content) or re.search(r"https?://arxiv\.org/abs/([^\s,}]+)", content)
+        arxiv_match = self.ARXIV_PATTERNS[0].search(content) or self.ARXIV_PATTERNS[1].search(content)
         if arxiv_match:
             fields["arxiv"] = arxiv_match.group(1).strip()
 
         # Try to identify address/location
-        addr_patterns = [
-            r"address\s*[=:]\s*([^,\.]+)",  # address: XYZ
-            r"([A-Z][a-zA-Z]+,\s+[A-Z]{2,})",  # City, STATE
-            r"([A-Z][a-zA-Z]+,\s+[A-Z][a-zA-Z]+)",  # City, Country
-        ]
-
-        for pattern in addr_patterns:
-            match = re.search(pattern, content)
+        for pattern in self.ADDRESS_PATTERNS:
+            match = pattern.search(content)
             if match:
                 fields["address"] = match.group(1).strip()
                 break
 
         # Try to identify if it's a book
-        if re.search(r"\\textit{([^}]*book[^}]*)}", content, re.IGNORECASE) and "journal" not in fields:
+        if self.BOOK_PATTERN.search(content) and "journal" not in fields:
             fields["type"] = "book"
 
         return fields
@@ -420,80 +511,12 @@ class ReferenceParser:
         if not value:
             return value
 
-        # Common LaTeX escape sequences and their replacements
-        latex_escapes = {
-            "\\&": "&",
-            '\\"a': "ä",
-            '\\"A': "Ä",
-            '\\"o': "ö",
-            '\\"O': "Ö",
-            '\\"u': "ü",
-            '\\"U': "Ü",
-            "\\`a": "à",
-            "\\`A": "À",
-            "\\'e": "é",
-            "\\'E": "É",
-            "\\'a": "á",
-            "\\'A": "Á",
-            "\\'o": "ó",
-            "\\'O": "Ó",
-            "\\'u": "ú",
-            "\\'U": "Ú",
-            "\\'i": "í",
-            "\\'I": "Í",
-            "\\'{e}": "é",
-            "\\'{E}": "É",
-            "\\c{c}": "ç",
-            "\\c{C}": "Ç",
-            "\\~a": "ã",
-            "\\~A": "Ã",
-            "\\~n": "ñ",
-            "\\~N": "Ñ",
-            "\\ss": "ß",
-            "\\ae": "æ",
-            "\\AE": "Æ",
-            "\\oe": "œ",
-            "\\OE": "Œ",
-            "\\textbackslash": "\\",
-            "\\textgreater": ">",
-            "\\textless": "<",
-            "\\$": "$",
-            "\\%": "%",
-            "\\_": "_",
-            "\\#": "#",
-            # Greek letter replacements for math mode
-            "\\alpha": "alpha",
-            "\\beta": "beta",
-            "\\gamma": "gamma",
-            "\\delta": "delta",
-            "\\epsilon": "epsilon",
-            "\\zeta": "zeta",
-            "\\eta": "eta",
-            "\\theta": "theta",
-            "\\iota": "iota",
-            "\\kappa": "kappa",
-            "\\lambda": "lambda",
-            "\\mu": "mu",
-            "\\nu": "nu",
-            "\\xi": "xi",
-            "\\pi": "pi",
-            "\\rho": "rho",
-            "\\sigma": "sigma",
-            "\\tau": "tau",
-            "\\upsilon": "upsilon",
-            "\\phi": "phi",
-            "\\chi": "chi",
-            "\\psi": "psi",
-            "\\omega": "omega",
-        }
-
         # Replace LaTeX escape sequences
-        for escape, replacement in latex_escapes.items():
+        for escape, replacement in self.LATEX_ESCAPES.items():
             value = value.replace(escape, replacement)
 
         # Handle special pattern \"{x} format (for umlauts and accents)
-        value = re.sub(
-            r"\\\"{\s*([aouiAOUI])\s*}",
+        value = self.UMLAUT_PATTERN.sub(
             lambda m: "ä"
             if m.group(1).lower() == "a"
             else "ö"
@@ -508,10 +531,10 @@ class ReferenceParser:
 
         # Handle math mode content by removing the math delimiters
         # This must happen after the LaTeX escapes are handled
-        value = re.sub(r"\$([^$]+)\$", r"\1", value)
+        value = self.MATH_PATTERN.sub(r"\1", value)
 
         # Remove unnecessary quotes and braces that don't serve as escape sequences
-        value = re.sub(r"{([^{}]*)}", r"\1", value)
+        value = self.BRACES_PATTERN.sub(r"\1", value)
 
         # Normalize whitespace
         value = " ".join(value.split())
@@ -6,13 +6,20 @@ embeddings for text and PDF files. It handles sending requests, managing asynchr
 tasks, and handling potential errors.
 """
 
+import hashlib
+import json
 import os
+import random
+import sqlite3
+import threading
 import time
 import logging
-from typing import List, Optional, Dict
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Dict
+import numpy as np
 import ollama
 import pymupdf
-from transformers import AutoTokenizer
 from dotenv import load_dotenv
 from openai import OpenAI
 import httpx
@@ -29,12 +36,6 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class TokenizerNotAvailableError(Exception):
-    """Raised when the required tokenizer is not available or failed to load."""
-
-    pass
-
-
 class OllamaInitializationError(Exception):
     """Raised when Ollama initialization fails."""
 
@@ -43,7 +44,7 @@ class OllamaInitializationError(Exception):
 
 # --- Configuration ---
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")  # Default to localhost if not specified
-logger.info(f"OLLAMA_HOST is set to: {OLLAMA_HOST}")
+logger.info("OLLAMA_HOST is set to: %s", OLLAMA_HOST)
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1")
 OLLAMA_EMBEDDING_MODEL = os.getenv("OLLAMA_EMBEDDING_MODEL", "mxbai-embed-large")
 OLLAMA_USERNAME = os.getenv("OLLAMA_USERNAME", "")
@@ -51,49 +52,379 @@ OLLAMA_PASSWORD = os.getenv("OLLAMA_PASSWORD", "")
 OLLAMA_API_TIMEOUT = int(os.getenv("OLLAMA_API_TIMEOUT", "60"))
 OLLAMA_MAX_RETRIES = int(os.getenv("OLLAMA_MAX_RETRIES", "3"))
 OLLAMA_RETRY_DELAY = int(os.getenv("OLLAMA_RETRY_DELAY", "2"))
-
-# Initialize Ollama and tokenizer at module import
-TOKENIZER = None
+OLLAMA_MAX_RETRY_DELAY = float(os.getenv("OLLAMA_MAX_RETRY_DELAY", "30"))
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "16"))
+OLLAMA_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "30"))
+OLLAMA_EMBED_CONCURRENCY = int(os.getenv("OLLAMA_EMBED_CONCURRENCY", "8"))
+OLLAMA_EMBED_BATCH_SIZE = int(os.getenv("OLLAMA_EMBED_BATCH_SIZE", "16"))
+OLLAMA_MIN_SEGMENT_CHARS = int(os.getenv("OLLAMA_MIN_SEGMENT_CHARS", "32"))
+OLLAMA_EMBED_CACHE_SIZE = int(os.getenv("OLLAMA_EMBED_CACHE_SIZE", "4096"))
+OLLAMA_EMBED_CACHE_PATH = os.getenv("OLLAMA_EMBED_CACHE_PATH", "")  # SQLite file for a persistent cache, off if empty
+OLLAMA_METADATA_CACHE_SIZE = int(os.getenv("OLLAMA_METADATA_CACHE_SIZE", "256"))
+# Return placeholder metadata from get_paper_info instead of asking the chat model, until extraction is reliable
+OLLAMA_FAKE_METADATA = os.getenv("OLLAMA_FAKE_METADATA", "true").lower() in ("1", "true", "yes")
+
+# The Ollama clients are created on first use rather than at import, so importing this module
+# (scripts, tests, worker start-up) does not wait for model downloads
 OLLAMA_CLIENT = None
+_INSTRUCTOR_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+_INSTRUCTOR_CLIENT_LOCK = threading.Lock()
+
+# Embeddings already computed in this process, keyed by (model, digest of the text), least recently used
+# first. Boilerplate paragraphs shared by many papers and repeated search queries are embedded only once.
+# Entries are float32 arrays, an eighth of the memory of the lists of Python floats returned by the client.
+_EMBED_CACHE: OrderedDict = OrderedDict()
+_EMBED_CACHE_LOCK = threading.Lock()
+
+# Batch embedding requests in flight across the process. Papers embedded concurrently, e.g. the references of a
+# paper, each start their own pool of OLLAMA_EMBED_CONCURRENCY workers; this keeps their requests within one limit.
+_EMBED_REQUEST_SLOTS = threading.BoundedSemaphore(OLLAMA_EMBED_CONCURRENCY)
+
+# Optional second level of the embedding cache that survives restarts, opened on first use.
+# It also persists the metadata cache below. The connection has its own lock, so threads that only need the
+# in-memory caches do not wait on disk I/O, and is disabled for the rest of the process if it cannot be opened.
+_EMBED_CACHE_DB: Optional[sqlite3.Connection] = None
+_EMBED_CACHE_DB_LOCK = threading.Lock()
+_EMBED_CACHE_DB_DISABLED = False
+
+# Metadata extracted by the chat model as PaperMetadata JSON, keyed by (model, digest of the first page),
+# least recently used first. Extraction takes seconds, so a paper processed again is answered from here.
+_METADATA_CACHE: OrderedDict = OrderedDict()
+_METADATA_CACHE_LOCK = threading.Lock()
 
 
 def _initialize_module():
-    """Initialize the module's global components"""
-    global TOKENIZER, OLLAMA_CLIENT
+    """Initialize the module's Ollama client and pull the models it uses"""
+    global OLLAMA_CLIENT
     try:
-        # Initialize tokenizer
-        TOKENIZER = AutoTokenizer.from_pretrained("mixedbread-ai/mxbai-embed-large-v1")
-
-        # Initialize Ollama client and pull model
-        logger.info(f"Initializing Ollama client with host: {OLLAMA_HOST}")
+        # Initialize Ollama client and pull model. The client keeps its HTTP connections alive between
+        # requests, so embedding many chunks does not pay a new TCP handshake per request. Idle connections
+        # are kept for OLLAMA_KEEPALIVE_EXPIRY seconds so they also survive the gaps between uploads.
+        logger.info("Initializing Ollama client with host: %s", OLLAMA_HOST)
+        client_options = {
+            "host": OLLAMA_HOST,
+            "timeout": OLLAMA_API_TIMEOUT,
+            "limits": httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_MAX_CONNECTIONS,
+                keepalive_expiry=OLLAMA_KEEPALIVE_EXPIRY,
+            ),
+        }
         if OLLAMA_USERNAME and OLLAMA_PASSWORD:
-            OLLAMA_CLIENT = ollama.Client(host=OLLAMA_HOST, auth=(OLLAMA_USERNAME, OLLAMA_PASSWORD))
+            client = ollama.Client(**client_options, auth=(OLLAMA_USERNAME, OLLAMA_PASSWORD))
             logger.info("Connected to Ollama with authentication")
         else:
-            OLLAMA_CLIENT = ollama.Client(host=OLLAMA_HOST)
+            client = ollama.Client(**client_options)
             logger.info("Connected to Ollama without authentication")
 
-        OLLAMA_CLIENT.pull(OLLAMA_EMBEDDING_MODEL)
-        logger.info(f"Successfully pulled Ollama model: {OLLAMA_EMBEDDING_MODEL}")
-
-        # Also pull the chat model
-        OLLAMA_CLIENT.pull(OLLAMA_MODEL)
-        logger.info(f"Successfully pulled Ollama model: {OLLAMA_MODEL}")
+        # Pull the embedding and the chat model at the same time. The client is published only afterwards,
+        # so no caller uses it while a model is still being pulled; it is published even if a pull fails,
+        # since the model may be available on the server regardless.
+        try:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                pulls = [(model, executor.submit(client.pull, model)) for model in (OLLAMA_EMBEDDING_MODEL, OLLAMA_MODEL)]
+                for model, pull in pulls:
+                    pull.result()
+                    logger.info("Successfully pulled Ollama model: %s", model)
+        finally:
+            OLLAMA_CLIENT = client
     except Exception as e:
-        logger.error(f"Failed to initialize module: {e}")
+        logger.error("Failed to initialize module: %s", e)
         raise OllamaInitializationError(f"Failed to initialize Ollama: {e}") from e
 
 
-# Run initialization unless we're in a test environment
-if not os.getenv("PYTEST_RUNNING"):
-    try:
-        _initialize_module()
-    except Exception as e:
-        logger.error(f"Module initialization failed: {e}")
+def _get_client() -> Optional[ollama.Client]:
+    """
+    Returns the shared Ollama client, initializing it on first use.
+
+    Returns:
+        Optional[ollama.Client]: The client, or None if it could not be created.
+    """
+    if OLLAMA_CLIENT is None:
+        with _CLIENT_LOCK:
+            if OLLAMA_CLIENT is None:
+                try:
+                    _initialize_module()
+                except OllamaInitializationError as e:
+                    logger.error("Module initialization failed: %s", e)
+    return OLLAMA_CLIENT
+
+
+def _get_instructor_client() -> instructor.Instructor:
+    """
+    Returns the shared instructor client for structured chat completions, creating it on first use.
+    Reusing it keeps its connection pool alive between metadata extractions.
+
+    Returns:
+        instructor.Instructor: An instructor-patched OpenAI client for Ollama's OpenAI compatibility endpoint.
+    """
+    global _INSTRUCTOR_CLIENT
+    if _INSTRUCTOR_CLIENT is None:
+        with _INSTRUCTOR_CLIENT_LOCK:
+            if _INSTRUCTOR_CLIENT is None:
+                # enables `response_model` in create call
+                _INSTRUCTOR_CLIENT = instructor.from_openai(
+                    OpenAI(
+                        base_url=f"{OLLAMA_HOST.rstrip('/')}/v1",  # Use the OpenAI compatibility endpoint, ensure no double slashes
+                        api_key="ollama",  # required, but unused
+                        http_client=httpx.Client(
+                            auth=httpx.BasicAuth(username=OLLAMA_USERNAME, password=OLLAMA_PASSWORD) if OLLAMA_USERNAME and OLLAMA_PASSWORD else None,
+                            timeout=OLLAMA_API_TIMEOUT,
+                            limits=httpx.Limits(
+                                max_connections=OLLAMA_MAX_CONNECTIONS,
+                                max_keepalive_connections=OLLAMA_MAX_CONNECTIONS,
+                                keepalive_expiry=OLLAMA_KEEPALIVE_EXPIRY,
+                            ),
+                        ),
+                    ),
+                    mode=instructor.Mode.JSON,
+                )
+    return _INSTRUCTOR_CLIENT
+
 
 # --- Helper Functions ---
 
 
+def _is_retryable(error: Exception) -> bool:
+    """
+    Decides whether a failed Ollama request is worth retrying. Client errors such as an unknown model
+    or an invalid request fail the same way on every attempt, except for rate limiting (429).
+
+    Args:
+        error (Exception): The exception raised by the request.
+
+    Returns:
+        bool: False for 4xx responses other than 429, True otherwise.
+    """
+    if isinstance(error, ollama.ResponseError):
+        return not 400 <= error.status_code < 500 or error.status_code == 429
+    return True
+
+
+def _is_missing_batch_endpoint(error: Exception) -> bool:
+    """
+    Decides whether a failed batch request means the server has no /api/embed endpoint. Servers that
+    predate it answer with 405, or with a plain 404. Current servers also answer 404 for a model that
+    has not been pulled, which names the model in the error and must not be mistaken for an old server.
+
+    Args:
+        error (Exception): The exception raised by the batch request.
+
+    Returns:
+        bool: True for a 405 or a 404 that does not mention the model, False otherwise.
+    """
+    if not isinstance(error, ollama.ResponseError):
+        return False
+    return error.status_code == 405 or (error.status_code == 404 and "model" not in str(error.error).lower())
+
+
+def _retry_delay(attempt: int) -> float:
+    """
+    Computes how long to wait before retrying a failed Ollama request.
+
+    Args:
+        attempt (int): The zero-based number of the attempt that failed.
+
+    Returns:
+        float: A random delay between zero and the exponential backoff for this attempt, capped at
+               OLLAMA_MAX_RETRY_DELAY. Spreading retries over the whole window keeps concurrent workers
+               that failed together from retrying in lockstep.
+    """
+    return random.uniform(0, min(OLLAMA_RETRY_DELAY * 2**attempt, OLLAMA_MAX_RETRY_DELAY))
+
+
+def _embed_cache_key(model: str, input_text: str) -> tuple:
+    """
+    Builds the embedding cache key for a text, so the cache does not have to keep the text itself.
+
+    Args:
+        model (str): The Ollama model that produces the embedding.
+        input_text (str): The text to embed.
+
+    Returns:
+        tuple: The model name and a 128-bit BLAKE2b digest of the text.
+    """
+    return model, hashlib.blake2b(input_text.encode(), digest_size=16).digest()
+
+
+def _embed_cache_db() -> Optional[sqlite3.Connection]:
+    """
+    Opens the persistent embedding cache on first use. Must be called with _EMBED_CACHE_DB_LOCK held.
+
+    Returns:
+        Optional[sqlite3.Connection]: The cache database, or None if OLLAMA_EMBED_CACHE_PATH is not set
+                                      or the database cannot be opened.
+    """
+    global _EMBED_CACHE_DB, _EMBED_CACHE_DB_DISABLED
+    if _EMBED_CACHE_DB is None and OLLAMA_EMBED_CACHE_PATH and not _EMBED_CACHE_DB_DISABLED:
+        try:
+            db = sqlite3.connect(OLLAMA_EMBED_CACHE_PATH, check_same_thread=False)
+            # The cache can always be rebuilt from Ollama, so durability is traded for faster writes
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS embeddings (model TEXT, digest BLOB, embedding BLOB, PRIMARY KEY (model, digest))")
+            db.execute("CREATE TABLE IF NOT EXISTS paper_metadata (model TEXT, digest BLOB, metadata TEXT, PRIMARY KEY (model, digest))")
+            _EMBED_CACHE_DB = db
+        except sqlite3.Error as e:
+            logger.error("Failed to open embedding cache %s, continuing without it: %s", OLLAMA_EMBED_CACHE_PATH, e)
+            _EMBED_CACHE_DB_DISABLED = True
+    return _EMBED_CACHE_DB
+
+
+def _cache_db_get(query: str, key: tuple) -> Optional[Any]:
+    """
+    Looks up a value in the persistent cache if enabled.
+
+    Args:
+        query (str): The SELECT statement for the value, taking the model and digest of the key.
+        key (tuple): The key built by _embed_cache_key.
+
+    Returns:
+        Optional[Any]: The stored value, or None if it is not stored or the cache is disabled.
+    """
+    with _EMBED_CACHE_DB_LOCK:
+        db = _embed_cache_db()
+        if db is None:
+            return None
+        try:
+            row = db.execute(query, key).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Persistent cache lookup failed: %s", e)
+            return None
+    return row[0] if row is not None else None
+
+
+def _cache_db_put(query: str, key: tuple, value: Any) -> None:
+    """
+    Stores a value in the persistent cache if enabled.
+
+    Args:
+        query (str): The INSERT statement for the value, taking the model and digest of the key and the value.
+        key (tuple): The key built by _embed_cache_key.
+        value (Any): The value to store.
+    """
+    with _EMBED_CACHE_DB_LOCK:
+        db = _embed_cache_db()
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute(query, (*key, value))
+        except sqlite3.Error as e:
+            logger.warning("Failed to write persistent cache: %s", e)
+
+
+def _lru_get(cache: OrderedDict, lock: threading.Lock, key: tuple) -> Optional[Any]:
+    """
+    Looks up a value in an in-process LRU cache and marks it as most recently used.
+
+    Args:
+        cache (OrderedDict): The cache, least recently used entry first.
+        lock (threading.Lock): The lock guarding the cache.
+        key (tuple): The key built by _embed_cache_key.
+
+    Returns:
+        Optional[Any]: The cached value, or None if it is not cached.
+    """
+    with lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _lru_put(cache: OrderedDict, lock: threading.Lock, key: tuple, value: Any, max_size: int) -> None:
+    """
+    Stores a value in an in-process LRU cache, evicting the least recently used entries beyond max_size.
+
+    Args:
+        cache (OrderedDict): The cache, least recently used entry first.
+        lock (threading.Lock): The lock guarding the cache.
+        key (tuple): The key built by _embed_cache_key.
+        value (Any): The value to store.
+        max_size (int): The number of entries the cache keeps.
+    """
+    with lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
+
+def _embed_cache_get(key: tuple) -> Optional[np.ndarray]:
+    """
+    Looks up an embedding in the in-process embedding cache, then in the persistent cache if enabled.
+
+    Args:
+        key (tuple): The key built by _embed_cache_key.
+
+    Returns:
+        Optional[np.ndarray]: The cached float32 embedding, or None if it is not cached.
+    """
+    embedding = _lru_get(_EMBED_CACHE, _EMBED_CACHE_LOCK, key)
+    if embedding is not None:
+        return embedding
+
+    stored = _cache_db_get("SELECT embedding FROM embeddings WHERE model = ? AND digest = ?", key)
+    if stored is None:
+        return None
+    embedding = np.frombuffer(stored, dtype=np.float32)
+    _lru_put(_EMBED_CACHE, _EMBED_CACHE_LOCK, key, embedding, OLLAMA_EMBED_CACHE_SIZE)
+    return embedding
+
+
+def _embed_cache_put(key: tuple, embedding: List[float]) -> np.ndarray:
+    """
+    Remembers an embedding as float32, evicting the least recently used entry when the cache is full.
+    The embedding is also written to the persistent cache if enabled.
+
+    Args:
+        key (tuple): The key built by _embed_cache_key.
+        embedding (List[float]): The embedding returned by Ollama.
+
+    Returns:
+        np.ndarray: The embedding as stored in the cache.
+    """
+    embedding = np.asarray(embedding, dtype=np.float32)
+    _lru_put(_EMBED_CACHE, _EMBED_CACHE_LOCK, key, embedding, OLLAMA_EMBED_CACHE_SIZE)
+    _cache_db_put("INSERT OR REPLACE INTO embeddings (model, digest, embedding) VALUES (?, ?, ?)", key, embedding.tobytes())
+    return embedding
+
+
+def _metadata_cache_get(key: tuple) -> Optional[str]:
+    """
+    Looks up extracted paper metadata in the in-process metadata cache, then in the persistent cache if enabled.
+
+    Args:
+        key (tuple): The key built by _embed_cache_key for the chat model and the first page text.
+
+    Returns:
+        Optional[str]: The cached metadata as PaperMetadata JSON, or None if it is not cached.
+    """
+    metadata = _lru_get(_METADATA_CACHE, _METADATA_CACHE_LOCK, key)
+    if metadata is not None:
+        return metadata
+
+    metadata = _cache_db_get("SELECT metadata FROM paper_metadata WHERE model = ? AND digest = ?", key)
+    if metadata is not None:
+        _lru_put(_METADATA_CACHE, _METADATA_CACHE_LOCK, key, metadata, OLLAMA_METADATA_CACHE_SIZE)
+    return metadata
+
+
+def _metadata_cache_put(key: tuple, metadata: str) -> None:
+    """
+    Remembers extracted paper metadata, evicting the least recently used entry when the cache is full.
+    The metadata is also written to the persistent cache if enabled.
+
+    Args:
+        key (tuple): The key built by _embed_cache_key for the chat model and the first page text.
+        metadata (str): The metadata as PaperMetadata JSON.
+    """
+    _lru_put(_METADATA_CACHE, _METADATA_CACHE_LOCK, key, metadata, OLLAMA_METADATA_CACHE_SIZE)
+    _cache_db_put("INSERT OR REPLACE INTO paper_metadata (model, digest, metadata) VALUES (?, ?, ?)", key, metadata)
+
+
 def _send_embed_request_to_ollama(input_text: str, model: str) -> Optional[List[float]]:
     """
     Wrapper for calling the ollama.embed function with retry logic.
@@ -106,62 +437,203 @@ def _send_embed_request_to_ollama(input_text: str, model: str) -> Optional[List[
         Optional[List[float]]: A list of floats representing the embedding,
                                or None if all attempts fail.
     """
-    global OLLAMA_CLIENT
-    if OLLAMA_CLIENT is None:
+    client = _get_client()
+    if client is None:
         logger.error("Ollama client not initialized")
         return None
 
+    cache_key = _embed_cache_key(model, input_text)
+    cached = _embed_cache_get(cache_key)
+    if cached is not None:
+        return cached.tolist()
+
+    attempts = 0
     for attempt in range(OLLAMA_MAX_RETRIES):
+        attempts = attempt + 1
         try:
-            response = OLLAMA_CLIENT.embeddings(model=model, prompt=input_text)
+            response = client.embeddings(model=model, prompt=input_text)
             if not response or "embedding" not in response:
                 raise ValueError(f"Invalid embedding response: {response}")
+            _embed_cache_put(cache_key, response["embedding"])
             return response["embedding"]
         except Exception as e:
-            logger.error(f"Ollama.embed request failed (attempt {attempt + 1}/{OLLAMA_MAX_RETRIES}): {e}")
+            logger.error("Ollama.embed request failed (attempt %s/%s): %s", attempt + 1, OLLAMA_MAX_RETRIES, e)
+            if not _is_retryable(e):
+                break
+            if attempt < OLLAMA_MAX_RETRIES - 1:
+                # Back off exponentially so a struggling server is not hit by all concurrent requests at once
+                time.sleep(_retry_delay(attempt))
+    logger.error("Ollama.embed request failed after %s attempts.", attempts)
+    return None
+
+
+def _send_embed_batch_to_ollama(input_texts: List[str], model: str) -> Optional[List[np.ndarray]]:
+    """
+    Wrapper for calling the batched ollama.embed endpoint with retry logic.
+    Texts whose embedding is already cached are skipped; all others are embedded
+    in a single request. If the server has no batch endpoint, the texts are
+    embedded one by one instead; a model that is not pulled is reported as an error.
+
+    Args:
+        input_texts (List[str]): The input texts for embedding generation.
+        model (str): The Ollama model to use.
+
+    Returns:
+        Optional[List[np.ndarray]]: One float32 embedding per input text, in input order,
+                                    or None if all attempts fail.
+    """
+    client = _get_client()
+    if client is None:
+        logger.error("Ollama client not initialized")
+        return None
+
+    cache_keys = [_embed_cache_key(model, text) for text in input_texts]
+    embeddings = [_embed_cache_get(key) for key in cache_keys]
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if not missing:
+        return embeddings
+
+    attempts = 0
+    for attempt in range(OLLAMA_MAX_RETRIES):
+        attempts = attempt + 1
+        try:
+            with _EMBED_REQUEST_SLOTS:
+                response = client.embed(model=model, input=[input_texts[i] for i in missing])
+            if not response or len(response.get("embeddings") or []) != len(missing):
+                raise ValueError(f"Invalid batch embedding response: {response}")
+            for i, embedding in zip(missing, response["embeddings"], strict=True):
+                embeddings[i] = _embed_cache_put(cache_keys[i], embedding)
+            return embeddings
+        except Exception as e:
+            if _is_missing_batch_endpoint(e):
+                logger.warning("Ollama server has no batch embed endpoint, embedding texts one by one: %s", e)
+                for i in missing:
+                    embedding = _send_embed_request_to_ollama(input_texts[i], model)
+                    if embedding is None:
+                        return None
+                    embeddings[i] = np.asarray(embedding, dtype=np.float32)
+                return embeddings
+            if isinstance(e, ollama.ResponseError) and e.status_code == 404:
+                logger.error("Ollama embedding model %s not found: %s", model, e)
+                return None
+            logger.error("Ollama.embed batch request failed (attempt %s/%s): %s", attempt + 1, OLLAMA_MAX_RETRIES, e)
+            if not _is_retryable(e):
+                break
             if attempt < OLLAMA_MAX_RETRIES - 1:
-                time.sleep(OLLAMA_RETRY_DELAY)
-    logger.error(f"Ollama.embed request failed after {OLLAMA_MAX_RETRIES} attempts.")
+                time.sleep(_retry_delay(attempt))
+    logger.error("Ollama.embed batch request failed after %s attempts.", attempts)
     return None
 
 
 # --- Main API Functions ---
 
 
-def get_paper_embeddings(pdf_path: str) -> Dict[str, List[List[float]]]:
+def _paper_segments(text_content: List[Dict[str, Any]]) -> List[str]:
+    """
+    Selects the text segments of an extracted paper that are worth embedding.
+
+    Args:
+        text_content (List[Dict[str, Any]]): The chunks returned by extract_pdf_content.
+
+    Returns:
+        List[str]: The segment texts in document order. Empty segments and fragments shorter than
+                   OLLAMA_MIN_SEGMENT_CHARS, such as page numbers or figure labels, carry next to no
+                   meaning and are skipped.
+    """
+    segments = []
+    for chunk in text_content:
+        segment = chunk.get("content")
+        if segment and len(segment.strip()) >= OLLAMA_MIN_SEGMENT_CHARS:
+            segments.append(segment)
+    return segments
+
+
+def _embed_segments(segments: List[str], source: str) -> List[Optional[np.ndarray]]:
+    """
+    Embeds text segments in batches of OLLAMA_EMBED_BATCH_SIZE per request, with up to
+    OLLAMA_EMBED_CONCURRENCY requests in flight at once.
+
+    Args:
+        segments (List[str]): The segments to embed.
+        source (str): Where the segments come from, for log messages.
+
+    Returns:
+        List[Optional[np.ndarray]]: One float32 embedding per segment, in the order of the segments,
+                                    or None for segments whose batch failed.
+    """
+    # Papers repeat boilerplate such as running headers, footers and copyright lines, so each distinct
+    # segment is embedded once and its embedding reused for every repetition. Segments that differ only
+    # in case or whitespace count as the same.
+    segment_positions = {}
+    unique_segments = []
+    positions = []
+    for segment in segments:
+        key = " ".join(segment.split()).casefold()
+        if key not in segment_positions:
+            segment_positions[key] = len(unique_segments)
+            unique_segments.append(segment)
+        positions.append(segment_positions[key])
+
+    # Get embeddings for the segments in batches, so a paper costs a handful of round-trips instead of one
+    # per segment. The batches are independent and I/O bound, so they are sent concurrently, bounded by
+    # OLLAMA_EMBED_CONCURRENCY. The server pads every input of a batch to the longest one, so segments are
+    # batched longest first to keep similar lengths together, then put back in their original order.
+    order = sorted(range(len(unique_segments)), key=lambda i: len(unique_segments[i]), reverse=True)
+    batches = [order[i : i + OLLAMA_EMBED_BATCH_SIZE] for i in range(0, len(order), OLLAMA_EMBED_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=max(1, min(OLLAMA_EMBED_CONCURRENCY, len(batches)))) as executor:
+        results = executor.map(lambda batch: _send_embed_batch_to_ollama([unique_segments[i] for i in batch], model=OLLAMA_EMBEDDING_MODEL), batches)
+
+    unique_embeddings = [None] * len(unique_segments)
+    for batch, batch_embeddings in zip(batches, results, strict=True):
+        if not batch_embeddings:
+            logger.warning("Failed to get embeddings for %s segments in %s", len(batch), source)
+            continue
+        for index, embedding in zip(batch, batch_embeddings, strict=True):
+            unique_embeddings[index] = embedding
+
+    return [unique_embeddings[position] for position in positions]
+
+
+def _embeddings_result(embeddings: List[Optional[np.ndarray]]) -> Dict[str, Any]:
+    """
+    Builds the result of get_paper_embeddings from per-segment embeddings, leaving out failed segments.
+
+    Args:
+        embeddings (List[Optional[np.ndarray]]): The embeddings returned by _embed_segments.
+
+    Returns:
+        Dict[str, Any]: The embeddings as one contiguous float32 array with one row per segment,
+                        instead of a list of per-segment vectors, with the model name and version.
+    """
+    embeddings = [embedding for embedding in embeddings if embedding is not None]
+    embeddings = np.stack(embeddings) if embeddings else np.empty((0, 0), dtype=np.float32)
+    return {"embeddings": embeddings, "model_name": OLLAMA_EMBEDDING_MODEL, "model_version": "1.0"}
+
+
+def get_paper_embeddings(pdf_path: str) -> Dict[str, Any]:
     """
-    Gets the embeddings for a given PDF paper. The text is split into segments
-    and each segment is embedded separately.
+    Gets the embeddings for a given PDF paper. The text is split into segments,
+    which are embedded in batches of OLLAMA_EMBED_BATCH_SIZE per request, with up
+    to OLLAMA_EMBED_CONCURRENCY requests in flight at once.
 
     Returns:
         A dictionary containing:
-        - embeddings: List of embeddings (one per text segment)
+        - embeddings: float32 array with one row per embedded text segment
         - model_name: Name of the embedding model used
         - model_version: Version of the model used
     """
     try:
         text_content = extract_pdf_content(pdf_path)  # extracts & splits content into chunks
         if not text_content:
-            logger.warning(f"No text extracted from PDF: {pdf_path}")
-            return {"embeddings": [], "model_name": OLLAMA_EMBEDDING_MODEL, "model_version": "1.0"}
+            logger.warning("No text extracted from PDF: %s", pdf_path)
+            return _embeddings_result([])
 
-        # Get embeddings for each segment
-        embeddings = []
-        for chunk in text_content:
-            embedding = _send_embed_request_to_ollama(chunk.get("content"), model=OLLAMA_EMBEDDING_MODEL)
-            if embedding:
-                embeddings.append(embedding)
-            else:
-                logger.warning(f"Failed to get embedding for segment in {pdf_path}")
-
-        return {"embeddings": embeddings, "model_name": OLLAMA_EMBEDDING_MODEL, "model_version": "1.0"}
+        return _embeddings_result(_embed_segments(_paper_segments(text_content), pdf_path))
 
     except FileNotFoundError:
         raise
-    except TokenizerNotAvailableError:
-        raise
     except Exception as e:
-        logger.error(f"Error in get_paper_embeddings: {e}")
+        logger.error("Error in get_paper_embeddings: %s", e)
         raise
 
 
@@ -177,62 +649,63 @@ def get_query_embeddings(query_string: str) -> Optional[List[float]]:
     return embeddings
 
 
-def get_paper_info(file_path: str) -> dict:  #!TODO: Need to implement this function correctly,
-    # for now it returns fake data
+def get_paper_info(file_path: str, first_page_text: Optional[str] = None) -> dict:  #!TODO: Need to implement this function correctly,
+    # for now it returns fake data unless OLLAMA_FAKE_METADATA is disabled
     """
     Gets the metadata for a given PDF paper.
 
     Args:
         file_path: The path to the PDF file.
+        first_page_text: The text of the paper's first page, if the caller has already extracted it.
+                         The PDF is only opened when it is not given.
 
     Returns:
-        A dictionary containing metadata information for the paper.
+        A dictionary containing metadata information for the paper, with the publication date as an ISO string.
 
     Raises:
       FileNotFoundError:  If the file_path does not exist
       Exception:  For any other errors during processing
     """
 
-    logger.info(f"Returning fake metadata for paper: {file_path}")
-    return {
-        "title": "Sample Academic Paper Title",
-        "authors": ["John Doe", "Jane Smith", "Alex Johnson"],
-        "field_of_study": "Computer Science",
-        "journal": "Journal of AI Research",
-        "publication_date": "2025-03-28",
-        "doi": "10.1234/sample.5678",
-        "keywords": ["artificial intelligence", "machine learning", "neural networks"],
-    }
+    if OLLAMA_FAKE_METADATA:
+        logger.info("Returning fake metadata for paper: %s", file_path)
+        return {
+            "title": "Sample Academic Paper Title",
+            "authors": ["John Doe", "Jane Smith", "Alex Johnson"],
+            "field_of_study": "Computer Science",
+            "journal": "Journal of AI Research",
+            "publication_date": "2025-03-28",
+            "doi": "10.1234/sample.5678",
+            "keywords": ["artificial intelligence", "machine learning", "neural networks"],
+        }
 
-    _initialize_module()  # Ensure Ollama is initialized
     try:
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        # Use PDFDocument from pdfreader module instead of calling pdfreader directly
-        # doc = pdfreader.PDFDocument(file_path)
-        # first_page = doc.pages[0]
-        # text = first_page.extract_text()
-
-        doc = pymupdf.open(file_path)
-        if doc.page_count > 0:
-            first_page = doc.load_page(0)
-            text = first_page.get_text("text")
-
-        # enables `response_model` in create call
-        client = instructor.from_openai(
-            OpenAI(
-                base_url=f"{OLLAMA_HOST.rstrip('/')}/v1",  # Use the OpenAI compatibility endpoint, ensure no double slashes
-                api_key="ollama",  # required, but unused
-                http_client=httpx.Client(
-                    auth=httpx.BasicAuth(username=OLLAMA_USERNAME, password=OLLAMA_PASSWORD) if OLLAMA_USERNAME and OLLAMA_PASSWORD else None,
-                    timeout=OLLAMA_API_TIMEOUT,
-                ),
-            ),
-            mode=instructor.Mode.JSON,
-        )
-
-        resp = client.chat.completions.create(
+        text = first_page_text
+        if text is None:
+            # Opening the PDF doubles as the existence check, instead of a separate os.path.exists stat beforehand
+            try:
+                doc = pymupdf.open(file_path)
+            except pymupdf.FileNotFoundError as e:
+                raise FileNotFoundError(f"File not found: {file_path}") from e
+            text = ""
+            with doc:
+                if doc.page_count > 0:
+                    first_page = doc.load_page(0)
+                    text = first_page.get_text("text")
+
+        # The extraction only depends on the model and the first page, so a paper seen before is answered
+        # from the cache. Including the model in the key keeps a model change from serving stale output.
+        # A first page without a text layer (scans, image covers) says nothing about the paper, and all such
+        # papers would share one key, so they are never cached.
+        cache_key = _embed_cache_key(OLLAMA_MODEL, text) if text.strip() else None
+        cached = _metadata_cache_get(cache_key) if cache_key is not None else None
+        if cached is not None:
+            logger.info("Using cached metadata for paper: %s", file_path)
+            # The JSON was validated when it was extracted, so it is only decoded here
+            return json.loads(cached)
+
+        _get_client()  # Ensure Ollama is initialized and the chat model is pulled
+        resp = _get_instructor_client().chat.completions.create(
             model=OLLAMA_MODEL,
             messages=[
                 {
@@ -256,7 +729,10 @@ def get_paper_info(file_path: str) -> dict:  #!TODO: Need to implement this func
             response_model=PaperMetadata,
         )
 
-        return resp.model_dump()
+        metadata = resp.model_dump_json()
+        if cache_key is not None:
+            _metadata_cache_put(cache_key, metadata)
+        return json.loads(metadata)
     except Exception as e:
-        logger.error(f"Error generating paper info for {file_path}: {e}")
+        logger.error("Error generating paper info for %s: %s", file_path, e)
         raise e
@@ -1,29 +1,45 @@
+from itertools import islice
+from typing import Iterator, Optional, Tuple
+
+import pymupdf
 from unstructured.partition.pdf import partition_pdf
 
+# A PDF whose first TEXT_LAYER_PROBE_PAGES pages hold at least TEXT_LAYER_MIN_CHARS characters of
+# embedded text is treated as born-digital; anything else is treated as a scan
+TEXT_LAYER_PROBE_PAGES = 3
+TEXT_LAYER_MIN_CHARS = 200
+
 
-def extract_pdf_content(pdf_path, max_context_length=512):
+def extract_pdf_content(pdf_path, max_context_length=512, strategy: Optional[str] = None):
     """
     Extracts structured content (titles + associated elements) from a PDF file.
 
     Args:
         pdf_path (str): path to the PDF file
         max_context_length(int): max context length of respective embedding model
+        strategy (str): unstructured partitioning strategy. By default "fast" for PDFs with a text layer
+                        and "hi_res" (layout detection model and OCR) for scans.
     Returns:
     content(list): a list of extracted chunks where each chunks is a dict. The chunks content can be accessed under argument "content"
 
     """
     print(f"Processing PDF: {pdf_path}")
 
+    # The hi_res layout model takes seconds per document; born-digital PDFs can be read from their text layer
+    if strategy is None:
+        strategy = "fast" if _has_text_layer(pdf_path) else "hi_res"
+
     # Parse the PDF into elements using unstructured
     chunks = partition_pdf(
         filename=pdf_path,
-        strategy="hi_res",
+        strategy=strategy,
         extract_images_in_pdf=False,
         chunking_strategy="by_title",
         max_characters=max_context_length,
     )
 
     content = []
+    titles = []
     current_chapter = None
     prev_title = None
 
@@ -47,21 +63,21 @@ def extract_pdf_content(pdf_path, max_context_length=512):
                     element_data["prev_title"] = prev_title
                     prev_title = element_text
                     current_chapter = element_text  # Update chapter marker
+                    titles.append(element_data)
 
                 content.append(element_data)
 
-    # Set next_title for all titles
-    title_elements = [item for item in content if item["type"] == "Title"]
-    for i in range(len(title_elements) - 1):
-        title_elements[i]["next_title"] = title_elements[i + 1]["content"]
+    # Set next_title for all titles, using the titles collected above instead of filtering content again
+    for title, next_title in zip(titles, titles[1:], strict=False):
+        title["next_title"] = next_title["content"]
 
-    if title_elements:
-        title_elements[-1]["next_title"] = ""
+    if titles:
+        titles[-1]["next_title"] = ""
 
     # Debugging
     # print(f" Total elements extracted: {len(content)}")
-    # print(f" Titles found: {len(title_elements)}")
-    # for t in title_elements:
+    # print(f" Titles found: {len(titles)}")
+    # for t in titles:
     #    print(f"  - Title: {t['content'][:60]!r} | Prev: {t.get('prev_title')!r} | Next: {t.get('next_title')!r}")
 
     # Group and count by chapter
@@ -84,18 +100,75 @@ def extract_pdf_content(pdf_path, max_context_length=512):
     return content
 
 
+def _iter_pdf_pages(pdf_path) -> Iterator[str]:
+    """
+    Yields the plain text of a PDF one page at a time.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+
+    Returns:
+        Iterator[str]: The text of each page, in page order. Only the current page is held in memory.
+
+    Raises:
+        FileNotFoundError: If the PDF file does not exist.
+    """
+    try:
+        doc = pymupdf.open(pdf_path)
+    except pymupdf.FileNotFoundError as e:
+        raise FileNotFoundError(f"PDF file not found: {pdf_path}") from e
+
+    # Pages are read sequentially on purpose: PyMuPDF is not thread-safe, so get_text must not be called from a
+    # thread pool, and a process pool would re-import the application in every spawned worker.
+    with doc:
+        for page in doc:
+            yield page.get_text("text")
+
+
+def _has_text_layer(pdf_path) -> bool:
+    """
+    Checks whether a PDF carries embedded text, by reading the first few pages.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+
+    Returns:
+        bool: True if the first TEXT_LAYER_PROBE_PAGES pages hold at least TEXT_LAYER_MIN_CHARS characters of text.
+    """
+    pages = _iter_pdf_pages(pdf_path)
+    try:
+        return sum(len(text.strip()) for text in islice(pages, TEXT_LAYER_PROBE_PAGES)) >= TEXT_LAYER_MIN_CHARS
+    finally:
+        pages.close()
+
+
 def extract_text_from_pdf(pdf_path):
     """
-    Extracts text from a PDF using the unstructured library.
+    Extracts the plain text of a PDF using PyMuPDF.
 
     Args:
         pdf_path (str): Path to the PDF file.
-        output_file (str, optional): Path to save the extracted text. If None, text is not saved.
 
     Returns:
-        str: Extracted text from the PDF.
+        str: Extracted text from the PDF, with pages separated by newlines.
+    """
+    # Join the pages once instead of growing a string page by page
+    return "\n".join(_iter_pdf_pages(pdf_path))
+
+
+def load_pdf_text(pdf_path) -> Tuple[str, str]:
     """
-    elements = partition_pdf(filename=pdf_path)
-    extracted_text = "\n".join(str(element) for element in elements)
+    Extracts the plain text of a PDF together with the text of its first page, reading the PDF once.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+
+    Returns:
+        Tuple[str, str]: The full text with pages separated by newlines, and the text of the first page
+        ("" for a PDF without pages).
 
-    return extracted_text
+    Raises:
+        FileNotFoundError: If the PDF file does not exist.
+    """
+    pages = list(_iter_pdf_pages(pdf_path))
+    return "\n".join(pages), pages[0] if pages else ""
@@ -3,6 +3,17 @@ from typing import List, Optional
 from datetime import date
 import re
 
+_DOI_RE = re.compile(r"^10\.\d{4,9}/\S+$")
+_AUTHOR_RE = re.compile(r"^[A-Za-z ,.'-]+$")
+_DATE_RE = re.compile(
+    r"\b(?:"
+    r"(?:\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}) |"  # DD-MM-YYYY, MM/DD/YYYY, etc.
+    r"(?:\d{4}[-/.]\d{1,2}[-/.]\d{1,2}) |"  # YYYY-MM-DD, YYYY/MM/DD
+    r"(?:\d{1,2} \w{3,9} \d{2,4}) |"  # 01 Jan 2024, 1 January 2024
+    r"(?:\w{3,9} \d{1,2},? \d{2,4})"  # January 1, 2024
+    r")\b"
+)
+
 
 class PaperMetadata(BaseModel):
     title: str = Field(..., min_length=3, max_length=300, description="Title of the paper")
@@ -15,14 +26,14 @@ class PaperMetadata(BaseModel):
 
     @field_validator("doi")
     def validate_doi(cls, value):
-        if value and not re.match(r"^10\.\d{4,9}/[\S]+$", value):
+        if value and not _DOI_RE.match(value):
             raise ValueError("Invalid DOI format")
         return value
 
     @field_validator("authors", mode="before")
     def validate_author_names(cls, values):
         for value in values:
-            if not re.match(r"^[A-Za-z ,.'-]+$", value):
+            if not _AUTHOR_RE.match(value):
                 raise ValueError("Invalid author name format")
             if " " not in value:
                 raise ValueError("must contain a space")
@@ -30,14 +41,6 @@ class PaperMetadata(BaseModel):
 
     @field_validator("publication_date", mode="before")
     def validate_publication_data(cls, value):
-        if value and not re.match(
-            r"\b(?:"
-            r"(?:\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}) |"  # DD-MM-YYYY, MM/DD/YYYY, etc.
-            r"(?:\d{4}[-/.]\d{1,2}[-/.]\d{1,2}) |"  # YYYY-MM-DD, YYYY/MM/DD
-            r"(?:\d{1,2} \w{3,9} \d{2,4}) |"  # 01 Jan 2024, 1 January 2024
-            r"(?:\w{3,9} \d{1,2},? \d{2,4})"  # January 1, 2024
-            r")\b",
-            value,
-        ):
+        if value and not _DATE_RE.match(value):
             raise ValueError("Invalid Publication Date Format")
         return value
@@ -1,10 +1,14 @@
 import logging
+import random
 import tarfile
-from typing import Generator, Optional, List
+import time
+import urllib.error
+from typing import Callable, Generator, Optional, List
 import arxiv
 import re
 import pymupdf
 import os
+import threading
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -12,6 +16,21 @@ logger = logging.getLogger(__name__)
 # Initialize global client
 client = arxiv.Client()
 
+# The client spaces out its API requests to respect arXiv's rate limit, but does not synchronise threads.
+# Requests from concurrent callers are serialised through this lock.
+_API_LOCK = threading.Lock()
+
+# PDF and source downloads bypass the client, so they are limited separately: at most
+# ARXIV_DOWNLOAD_CONCURRENCY run at once, and a download that arXiv rejects with 429 or 503 is retried
+# after the server's Retry-After or a jittered exponential backoff starting at ARXIV_DOWNLOAD_RETRY_DELAY seconds
+ARXIV_DOWNLOAD_CONCURRENCY = int(os.getenv("ARXIV_DOWNLOAD_CONCURRENCY", "2"))
+ARXIV_DOWNLOAD_RETRIES = int(os.getenv("ARXIV_DOWNLOAD_RETRIES", "3"))
+ARXIV_DOWNLOAD_RETRY_DELAY = float(os.getenv("ARXIV_DOWNLOAD_RETRY_DELAY", "3"))
+_DOWNLOAD_SEMAPHORE = threading.BoundedSemaphore(ARXIV_DOWNLOAD_CONCURRENCY)
+
+# New-style arXiv identifier (e.g. 2401.12345), compiled once for all extractions
+ARXIV_ID_PATTERN = re.compile(r"\d{4}\.\d{5}")
+
 
 class ArxivRetrievalError(Exception):
     """Base exception for arxiv retrieval errors."""
@@ -81,8 +100,9 @@ def _search_arxiv_id(arxiv_id: str) -> Optional[arxiv.Result]:
     logger.debug(f"Searching for paper with arXiv ID: {arxiv_id}")
     try:
         search = arxiv.Search(id_list=[arxiv_id])
-        results = client.results(search)
-        result = next(results, None)
+        with _API_LOCK:
+            results = client.results(search)
+            result = next(results, None)
         if result:
             logger.info(f"Found paper with arXiv ID: {arxiv_id}")
         else:
@@ -117,8 +137,9 @@ def _search_arxiv_metadata(authors: str, title: str) -> Optional[arxiv.Result]:
             filters.append(f"ti:{title}")
         query = " AND ".join(filters)
         search = arxiv.Search(query=query, max_results=1, sort_by=arxiv.SortCriterion.Relevance, sort_order=arxiv.SortOrder.Descending)
-        results = client.results(search)
-        result = next(results, None)
+        with _API_LOCK:
+            results = client.results(search)
+            result = next(results, None)
         if result:
             logger.info("Found paper matching metadata search")
         else:
@@ -157,6 +178,33 @@ def _search_arxiv_all(query: str, max_results: int) -> Generator[arxiv.Result, N
         raise ArxivRetrievalError(f"Error searching arXiv with query '{query}': {str(e)}") from e
 
 
+def _throttled_download(download: Callable[[str], str], output_dir: str) -> str:
+    """
+    Run an arXiv download while respecting the download limit, retrying when arXiv asks to slow down.
+
+    Args:
+        download (Callable[[str], str]): The download method of a paper, e.g. paper.download_pdf.
+        output_dir (str): Directory where the file should be downloaded.
+
+    Returns:
+        str: Path to the downloaded file.
+
+    Raises:
+        urllib.error.HTTPError: If the download fails, or is still throttled after ARXIV_DOWNLOAD_RETRIES retries.
+    """
+    for attempt in range(ARXIV_DOWNLOAD_RETRIES + 1):
+        try:
+            with _DOWNLOAD_SEMAPHORE:
+                return download(output_dir)
+        except urllib.error.HTTPError as e:
+            if e.code not in (429, 503) or attempt == ARXIV_DOWNLOAD_RETRIES:
+                raise
+            retry_after = e.headers.get("Retry-After", "") if e.headers else ""
+            delay = float(retry_after) if retry_after.isdigit() else random.uniform(0, ARXIV_DOWNLOAD_RETRY_DELAY * 2**attempt)
+            logger.warning(f"arXiv throttled download (HTTP {e.code}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
 def _download_arxiv_id(arxiv_id: str, output_dir: str) -> Optional[str]:
     """
     Download a paper from arXiv using its ID.
@@ -196,8 +244,8 @@ def _download_arxiv_paper(paper: arxiv.Result, output_dir: str) -> str:
     """
     logger.debug(f"Attempting to download paper {paper.title} to {output_dir}")
     try:
-        path = paper.download_pdf(output_dir)
-        paper.download_source(output_dir)
+        path = _throttled_download(paper.download_pdf, output_dir)
+        _throttled_download(paper.download_source, output_dir)
         tar_gz_path = path[:-4] + ".tar.gz"
         if os.path.exists(tar_gz_path):
             try:
@@ -250,8 +298,7 @@ def extract_arxiv_ids(text: str) -> List[str]:
     Returns:
         List[str]: A list of extracted arXiv IDs.
     """
-    pattern = r"\d{4}\.\d{5}"
-    return re.findall(pattern, text)
+    return ARXIV_ID_PATTERN.findall(text)
 
 
 def paper_get_metadata(file_path: str) -> Optional[dict]:
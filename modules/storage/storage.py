@@ -5,11 +5,14 @@ This module provides a wrapper for S3/MinIO storage operations, handling file up
 downloads, and related operations with proper error handling and retrying mechanisms.
 """
 
+import io
 import os
-import time
 import logging
+from typing import BinaryIO, Union
 import boto3
 import botocore.exceptions
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from dotenv import load_dotenv
 from uuid_extensions import uuid7str as uuid7
 
@@ -24,13 +27,26 @@ MINIO_URL = os.getenv("MINIO_URL", "http://localhost:9000")
 MINIO_ROOT_USER = os.getenv("MINIO_ROOT_USER", "ROOT_USER")
 MINIO_ROOT_PASSWORD = os.getenv("MINIO_ROOT_PASSWORD", "TOOR_PASSWORD")
 BUCKET_NAME = os.getenv("MINIO_BUCKET_NAME", "papers")
+S3_MAX_CONCURRENCY = int(os.getenv("S3_MAX_CONCURRENCY", "16"))
 
-# Initialize the MinIO client using boto3
+# Initialize the MinIO client using boto3. Its connection pool is sized for the concurrent part transfers
+# below plus other requests, so concurrent uploads do not queue on botocore's default pool of 10 connections.
+# This is the only retry layer for S3 requests: botocore retries each failed request up to 5 times,
+# with jittered backoff and client-side rate limiting when the server throttles.
 s3_client = boto3.client(
     "s3",
     endpoint_url=MINIO_URL,
     aws_access_key_id=MINIO_ROOT_USER,
     aws_secret_access_key=MINIO_ROOT_PASSWORD,
+    config=Config(max_pool_connections=2 * S3_MAX_CONCURRENCY, retries={"max_attempts": 5, "mode": "adaptive"}),
+)
+
+# Files above 8 MiB are transferred in 8 MiB parts, up to S3_MAX_CONCURRENCY parts at a time
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=S3_MAX_CONCURRENCY,
+    use_threads=True,
 )
 
 
@@ -48,7 +64,7 @@ class S3DownloadError(Exception):
 
 def upload_file(file_path: str) -> str:
     """
-    Uploads a file to S3 with error handling and retry mechanism.
+    Uploads a file to S3 with error handling.
 
     Description:
         Uploads the file located at `file_path` to the S3 storage and returns its URL.
@@ -60,28 +76,51 @@ def upload_file(file_path: str) -> str:
         str: The URL of the uploaded file on S3.
 
     Raises:
-        S3UploadError: If the upload fails after the maximum number of retries.
+        S3UploadError: If the upload still fails after the client's retries.
 
     Example:
         url = upload_file("/path/to/file.pdf")
     """
+    with open(file_path, "rb") as f:
+        return upload_bytes(f, os.path.basename(file_path))
+
+
+def upload_bytes(data: Union[bytes, BinaryIO], filename: str) -> str:
+    """
+    Uploads in-memory data or an open binary file to S3 with error handling.
+
+    Description:
+        Streams `data` to the S3 storage under `filename` and returns its URL, so callers that already hold
+        the content do not need to write it to a temporary file first. The object is uploaded with a CRC32
+        checksum, which is computed in native code and verified by the server, instead of a Python-side MD5.
+
+    Parameters:
+        data (bytes | BinaryIO): The content to upload, either as bytes or as a seekable binary file object.
+        filename (str): The file name the object is stored under.
+
+    Returns:
+        str: The URL of the uploaded file on S3.
+
+    Raises:
+        S3UploadError: If the upload still fails after the client's retries.
+
+    Example:
+        url = upload_bytes(pdf_bytes, "paper.pdf")
+    """
     file_id = str(uuid7())
-    file_name = os.path.basename(file_path)
-    object_name = f"{file_id}/{file_name}"
-    max_retries = 3
-    delay = 2  # seconds
-
-    for attempt in range(1, max_retries + 1):
-        try:
-            s3_client.upload_file(file_path, BUCKET_NAME, object_name)
-            url = f"{MINIO_URL}/{BUCKET_NAME}/{object_name}"
-            logger.info(f"Successfully uploaded file to S3: {url}")
-            return url
-        except (botocore.exceptions.ClientError, botocore.exceptions.EndpointConnectionError) as e:
-            logger.error(f"S3 error on attempt {attempt} for file {file_path}: {e}")
-            if attempt >= max_retries:
-                raise S3UploadError(f"Failed to upload {file_path} to S3 after {max_retries} attempts: {str(e)}") from e
-        time.sleep(delay)
+    object_name = f"{file_id}/{filename}"
+    fileobj = io.BytesIO(data) if isinstance(data, (bytes, bytearray, memoryview)) else data
+
+    # Failed requests are retried by the client itself (see s3_client), so a multipart upload only resends
+    # the failed part rather than restarting the whole file
+    try:
+        s3_client.upload_fileobj(fileobj, BUCKET_NAME, object_name, Config=TRANSFER_CONFIG, ExtraArgs={"ChecksumAlgorithm": "CRC32"})
+    except (botocore.exceptions.ClientError, botocore.exceptions.EndpointConnectionError) as e:
+        logger.error("S3 error uploading file %s: %s", filename, e)
+        raise S3UploadError(f"Failed to upload {filename} to S3: {str(e)}") from e
+    url = f"{MINIO_URL}/{BUCKET_NAME}/{object_name}"
+    logger.info("Successfully uploaded file to S3: %s", url)
+    return url
 
 
 def download_file(file_url: str, destination_path: str) -> None:
@@ -108,15 +147,15 @@ def download_file(file_url: str, destination_path: str) -> None:
     """
     prefix = f"{MINIO_URL}/{BUCKET_NAME}/"
     if not file_url.startswith(prefix):
-        logger.error(f"Invalid file URL: {file_url}")
+        logger.error("Invalid file URL: %s", file_url)
         raise ValueError(f"Invalid file URL: {file_url}")
     object_name = file_url[len(prefix) :]
 
     try:
-        s3_client.download_file(BUCKET_NAME, object_name, destination_path)
-        logger.info(f"Successfully downloaded file from S3 to {destination_path}")
+        s3_client.download_file(BUCKET_NAME, object_name, destination_path, Config=TRANSFER_CONFIG)
+        logger.info("Successfully downloaded file from S3 to %s", destination_path)
     except botocore.exceptions.ClientError as e:
-        logger.error(f"Error downloading file from S3: {e}")
+        logger.error("Error downloading file from S3: %s", e)
         raise S3DownloadError(f"Failed to download file from S3: {str(e)}") from e
 
 
@@ -143,13 +182,13 @@ def delete_file(file_url: str) -> None:
     """
     prefix = f"{MINIO_URL}/{BUCKET_NAME}/"
     if not file_url.startswith(prefix):
-        logger.error(f"Invalid file URL: {file_url}")
+        logger.error("Invalid file URL: %s", file_url)
         raise ValueError(f"Invalid file URL: {file_url}")
 
     object_name = file_url[len(prefix) :]
     try:
         s3_client.delete_object(Bucket=BUCKET_NAME, Key=object_name)
-        logger.info(f"Successfully deleted file from S3: {file_url}")
+        logger.info("Successfully deleted file from S3: %s", file_url)
     except botocore.exceptions.ClientError as e:
-        logger.error(f"Error deleting file from S3: {e}")
+        logger.error("Error deleting file from S3: %s", e)
         raise S3UploadError(f"Failed to delete file from S3: {str(e)}") from e
@@ -1,27 +1,37 @@
+import functools
 import boto3
 from botocore.exceptions import ClientError
 import os
 
 
-def create_bucket(s3_url, s3_access_key, s3_secret_key, bucket_name):
+@functools.lru_cache(maxsize=4)
+def get_s3_client(s3_url, s3_access_key, s3_secret_key):
     """
-    Create a bucket on the MinIO server using the AWS S3 API.
+    Return an S3 client for the given endpoint and credentials, reusing it across calls.
     """
-    # Initialize S3 client
-    s3_client = boto3.client(
+    return boto3.client(
         "s3",
         endpoint_url=s3_url,
         aws_access_key_id=s3_access_key,
         aws_secret_access_key=s3_secret_key,
     )
 
+
+def create_bucket(s3_url, s3_access_key, s3_secret_key, bucket_name):
+    """
+    Create a bucket on the MinIO server using the AWS S3 API.
+    """
+    s3_client = get_s3_client(s3_url, s3_access_key, s3_secret_key)
+
     try:
         # Check if the bucket already exists
-        response = s3_client.list_buckets()
-        for bucket in response.get("Buckets", []):
-            if bucket["Name"] == bucket_name:
-                print(f"Bucket '{bucket_name}' already exists.")
-                return
+        try:
+            s3_client.head_bucket(Bucket=bucket_name)
+            print(f"Bucket '{bucket_name}' already exists.")
+            return
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in ("404", "NoSuchBucket"):
+                raise
 
         # Create the bucket
         s3_client.create_bucket(Bucket=bucket_name)
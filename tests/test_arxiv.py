@@ -1,3 +1,4 @@
+import urllib.error
 import pytest
 from unittest.mock import patch, MagicMock
 from modules.retriever.arxiv.arxiv_retriever import (
@@ -113,6 +114,35 @@ def test_paper_download_arxiv_id_download_error(mock_arxiv, mock_arxiv_client):
         paper_download_arxiv_id(TEST_ARXIV_ID, TEST_OUTPUT_DIR)
 
 
+def test_paper_download_arxiv_id_retries_throttled_download(mock_arxiv, mock_arxiv_client):
+    """Test that a download arXiv rejects with 429 is retried after its Retry-After delay"""
+    paper = mock_arxiv._paper
+    throttled = urllib.error.HTTPError("http://arxiv.org/pdf", 429, "Too Many Requests", {"Retry-After": "5"}, None)
+    paper.download_pdf.side_effect = [throttled, TEST_PDF_PATH]
+    mock_arxiv_client.results.return_value = iter([paper])
+
+    with patch("modules.retriever.arxiv.arxiv_retriever.time.sleep") as mock_sleep:
+        result = paper_download_arxiv_id(TEST_ARXIV_ID, TEST_OUTPUT_DIR)
+
+    assert result == TEST_PDF_PATH
+    assert paper.download_pdf.call_count == 2
+    mock_sleep.assert_called_once_with(5.0)
+
+
+def test_paper_download_arxiv_id_not_found_not_retried(mock_arxiv, mock_arxiv_client):
+    """Test that a download failing for another reason than throttling is not retried"""
+    paper = mock_arxiv._paper
+    paper.download_pdf.side_effect = urllib.error.HTTPError("http://arxiv.org/pdf", 404, "Not Found", {}, None)
+    mock_arxiv_client.results.return_value = iter([paper])
+
+    with patch("modules.retriever.arxiv.arxiv_retriever.time.sleep") as mock_sleep:
+        with pytest.raises(ArxivDownloadError):
+            paper_download_arxiv_id(TEST_ARXIV_ID, TEST_OUTPUT_DIR)
+
+    paper.download_pdf.assert_called_once()
+    mock_sleep.assert_not_called()
+
+
 def test_paper_download_arxiv_metadata_success(mock_arxiv, mock_arxiv_client):
     """Test successful paper download using metadata"""
     mock_arxiv_client.results.return_value = iter([mock_arxiv._paper])
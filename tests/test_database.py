@@ -1,8 +1,11 @@
 import pytest
 import datetime
+import hashlib
+import uuid
 from unittest.mock import patch, MagicMock
 from modules.database.database import (
     paper_find,
+    paper_find_many,
     paper_insert,
     paper_update,
     paper_delete,
@@ -12,7 +15,14 @@ from modules.database.database import (
     paper_references_list,
     PaperNotFoundError,
     DuplicatePaperError,
+    FileHashError,
+    DatabaseError,
+    _HASH_CACHE,
+    _paper_compute_file_hash,
+    _process_reference_with_arxiv_id,
 )
+from modules.storage.storage import S3UploadError
+from pgvector import HalfVector
 
 # Test data
 TEST_PAPER_ID = "123e4567-e89b-12d3-a456-426614174000"
@@ -30,15 +40,17 @@ TEST_MARKDOWN_CONTENT = "# Test Paper\n\nThis is a test markdown content for the
 
 @pytest.fixture
 def mock_psycopg():
-    with patch("modules.database.database.psycopg") as mock:
+    with patch("modules.database.database.psycopg") as mock, patch("modules.database.database.POOL") as mock_pool:
         # Create mock cursor and connection
         mock_cursor = MagicMock()
         mock_conn = MagicMock()
         mock_conn.__enter__.return_value = mock_conn
         mock_conn.cursor.return_value.__enter__.return_value = mock_cursor
 
-        # Configure connect to return our mock connection
+        # Configure connect and the connection pool to return our mock connection
         mock.connect.return_value = mock_conn
+        mock_pool.connection.return_value = mock_conn
+        mock.pool = mock_pool
 
         # Mock psycopg.Error
         mock.Error = Exception
@@ -70,6 +82,14 @@ def mock_file_hash():
         yield mock
 
 
+@pytest.fixture(autouse=True)
+def clear_hash_cache():
+    # Start every test without file hashes remembered from earlier inserts
+    _HASH_CACHE.clear()
+    yield
+    _HASH_CACHE.clear()
+
+
 @pytest.fixture
 def sample_paper():
     return {
@@ -86,6 +106,20 @@ def sample_paper():
     }
 
 
+def test_paper_compute_file_hash(tmp_path):
+    """Test that the file hash is the SHA-256 of the file contents"""
+    file_path = tmp_path / "paper.pdf"
+    file_path.write_bytes(b"%PDF-1.4 test content")
+
+    assert _paper_compute_file_hash(str(file_path)) == hashlib.sha256(b"%PDF-1.4 test content").hexdigest()
+
+
+def test_paper_compute_file_hash_missing_file(tmp_path):
+    """Test that an unreadable file raises FileHashError"""
+    with pytest.raises(FileHashError):
+        _paper_compute_file_hash(str(tmp_path / "missing.pdf"))
+
+
 def test_paper_find_success(mock_psycopg, sample_paper):
     """Test successful paper retrieval"""
     cursor = mock_psycopg.connect().cursor().__enter__()
@@ -96,6 +130,36 @@ def test_paper_find_success(mock_psycopg, sample_paper):
     cursor.execute.assert_called_once()
 
 
+def test_paper_find_uses_prepared_statement(mock_psycopg, sample_paper):
+    """Test that the paper lookup is executed as a prepared statement on a pooled connection"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    cursor.fetchone.return_value = sample_paper
+
+    paper_find(TEST_PAPER_ID)
+
+    mock_psycopg.pool.connection.assert_called_once()
+    assert cursor.execute.call_args.kwargs == {"prepare": True}
+
+
+def test_paper_find_many(mock_psycopg, sample_paper):
+    """Test retrieving several papers with a single query"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    other_paper = {**sample_paper, "id": uuid.UUID("00000000-0000-7000-8000-000000000001")}
+    cursor.fetchall.return_value = [sample_paper, other_paper]
+
+    result = paper_find_many([TEST_PAPER_ID, str(other_paper["id"]), "missing"])
+
+    cursor.execute.assert_called_once()
+    assert "= ANY(" in cursor.execute.call_args[0][0]
+    assert result == {TEST_PAPER_ID: sample_paper, str(other_paper["id"]): other_paper}
+
+
+def test_paper_find_many_empty(mock_psycopg):
+    """Test that no query is issued for an empty list of ids"""
+    assert paper_find_many([]) == {}
+    mock_psycopg.pool.connection.assert_not_called()
+
+
 def test_paper_find_not_found(mock_psycopg):
     """Test paper retrieval when paper doesn't exist"""
     cursor = mock_psycopg.connect().cursor().__enter__()
@@ -108,7 +172,7 @@ def test_paper_find_not_found(mock_psycopg):
 def test_paper_insert_success(mock_psycopg, mock_storage, mock_ollama, mock_file_hash, sample_paper):
     """Test successful paper insertion with all fields including markdown content"""
     cursor = mock_psycopg.connect().cursor().__enter__()
-    cursor.fetchone.side_effect = [None]  # Only need None for duplicate check
+    cursor.fetchone.side_effect = [None, {"id": TEST_PAPER_ID}]  # No paper with this hash yet, then the row was inserted
     mock_storage.upload_file.return_value = TEST_FILE_URL
     mock_ollama.get_paper_embeddings.return_value = {
         "embeddings": [[0.1, 0.2], [0.2, 0.3]],
@@ -136,25 +200,20 @@ def test_paper_insert_success(mock_psycopg, mock_storage, mock_ollama, mock_file
     mock_storage.upload_file.assert_called_once_with(TEST_FILE_PATH)
     mock_ollama.get_paper_embeddings.assert_called_once()
 
-    # Verify correct SQL execution calls
-    assert cursor.execute.call_count >= 2
-
-    # Find the SQL insert statement in the execute calls
-    # First call is the duplicate check, second call should be the insert
-    insert_found = False
-    for call in cursor.execute.call_args_list:
-        sql = call[0][0]
-        if "INSERT INTO papers" in sql and "content" in sql:
-            insert_found = True
-            break
-
-    assert insert_found, "No INSERT INTO papers statement found in the SQL calls"
+    # After the duplicate lookup, the paper and all of its embeddings are written by a single statement
+    assert cursor.execute.call_count == 2
+    assert "WHERE file_hash = %s" in cursor.execute.call_args_list[0][0][0]
+    sql, params = cursor.execute.call_args[0]
+    assert "INSERT INTO papers" in sql and "content" in sql and "ON CONFLICT (file_hash)" in sql
+    assert "INSERT INTO paper_embeddings" in sql and "unnest(%(embeddings)b)" in sql
+    assert params["embeddings"] == [HalfVector([0.1, 0.2]), HalfVector([0.2, 0.3])]
+    assert params["content"] == TEST_MARKDOWN_CONTENT
 
 
 def test_paper_insert_minimal(mock_psycopg, mock_storage, mock_ollama, mock_file_hash):
     """Test paper insertion with only required fields"""
     cursor = mock_psycopg.connect().cursor().__enter__()
-    cursor.fetchone.side_effect = [None]  # Only need None for duplicate check
+    cursor.fetchone.side_effect = [None, {"id": "inserted"}]  # No paper with this hash yet, then the row was inserted
     mock_storage.upload_file.return_value = TEST_FILE_URL
     mock_ollama.get_paper_embeddings.return_value = {
         "embeddings": [[0.1, 0.2]],
@@ -171,17 +230,106 @@ def test_paper_insert_minimal(mock_psycopg, mock_storage, mock_ollama, mock_file
 
     mock_storage.upload_file.assert_called_once_with(TEST_FILE_PATH)
     mock_ollama.get_paper_embeddings.assert_called_once()
-    assert cursor.execute.call_count >= 2
+    assert cursor.execute.call_count == 2
 
 
-def test_paper_insert_duplicate(mock_psycopg, mock_file_hash, sample_paper):
-    """Test paper insertion with duplicate file"""
+def test_paper_insert_duplicate_found_before_upload(mock_psycopg, mock_storage, mock_ollama, mock_file_hash, sample_paper):
+    """Test that a file already in the database is rejected by the hash lookup before any upload or embedding"""
     cursor = mock_psycopg.connect().cursor().__enter__()
-    cursor.fetchone.return_value = sample_paper  # Return existing paper for duplicate check
+    cursor.fetchone.side_effect = [sample_paper]
+    mock_storage.S3UploadError = S3UploadError
 
-    with pytest.raises(DuplicatePaperError):
+    with pytest.raises(DuplicatePaperError, match=TEST_PAPER_ID):
         paper_insert(TEST_FILE_PATH, TEST_TITLE, TEST_AUTHORS)
 
+    mock_storage.upload_file.assert_not_called()
+    mock_ollama.get_paper_embeddings.assert_not_called()
+    cursor.execute.assert_called_once()
+    assert "WHERE file_hash = %s" in cursor.execute.call_args[0][0]
+
+
+def test_paper_insert_duplicate(mock_psycopg, mock_storage, mock_ollama, mock_file_hash, sample_paper):
+    """Test paper insertion with a duplicate stored concurrently, after the hash lookup"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    # The lookup finds nothing, the insert hits the conflict, then the existing paper is looked up
+    cursor.fetchone.side_effect = [None, None, sample_paper]
+    mock_storage.upload_file.return_value = TEST_FILE_URL
+    mock_storage.S3UploadError = S3UploadError
+
+    with pytest.raises(DuplicatePaperError, match=TEST_PAPER_ID):
+        paper_insert(TEST_FILE_PATH, TEST_TITLE, TEST_AUTHORS)
+
+    # The uploaded file must not be left behind; only the lookups and the fused insert ran
+    mock_storage.delete_file.assert_called_once_with(TEST_FILE_URL)
+    assert cursor.execute.call_count == 3
+    assert "WHERE file_hash = %s" in cursor.execute.call_args[0][0]
+
+
+def test_paper_insert_borrows_one_connection_after_io(mock_psycopg, mock_storage, mock_ollama, mock_file_hash):
+    """Test that no pooled connection is held during the upload and embedding"""
+    calls = []
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    cursor.fetchone.side_effect = [None, {"id": TEST_PAPER_ID}]
+    mock_storage.upload_file.side_effect = lambda *args: calls.append("upload") or TEST_FILE_URL
+    mock_ollama.get_paper_embeddings.side_effect = lambda *args: calls.append("embed") or {"embeddings": [[0.1]]}
+    mock_psycopg.pool.connection.side_effect = lambda: calls.append("connection") or mock_psycopg.connect()
+
+    paper_insert(TEST_FILE_PATH, TEST_TITLE, TEST_AUTHORS)
+
+    # One connection for the duplicate lookup before the I/O, one for the insert after it
+    assert calls[0] == calls[-1] == "connection"
+    assert calls.count("connection") == 2
+    mock_psycopg.connect().commit.assert_called_once()
+
+
+def test_paper_insert_hash_error_skips_upload(mock_psycopg, mock_storage, mock_ollama, mock_file_hash):
+    """Test that a failing hash computation stops the insert before anything is uploaded"""
+    mock_file_hash.side_effect = FileHashError("Failed to compute hash")
+    mock_storage.S3UploadError = S3UploadError
+
+    with pytest.raises(FileHashError):
+        paper_insert(TEST_FILE_PATH, TEST_TITLE, TEST_AUTHORS)
+
+    mock_storage.upload_file.assert_not_called()
+    mock_psycopg.pool.connection.assert_not_called()
+
+
+def test_paper_insert_embedding_error_discards_upload(mock_psycopg, mock_storage, mock_ollama, mock_file_hash):
+    """Test that a failing embedding generation removes the concurrently uploaded file"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    cursor.fetchone.return_value = None  # No paper with this hash yet
+    mock_ollama.get_paper_embeddings.side_effect = RuntimeError("Ollama unavailable")
+    mock_storage.upload_file.return_value = TEST_FILE_URL
+    mock_storage.S3UploadError = S3UploadError
+
+    with pytest.raises(DatabaseError):
+        paper_insert(TEST_FILE_PATH, TEST_TITLE, TEST_AUTHORS)
+
+    mock_storage.delete_file.assert_called_once_with(TEST_FILE_URL)
+    # Only the duplicate lookup reached the database
+    cursor.execute.assert_called_once()
+
+
+def test_paper_insert_cached_duplicate(mock_psycopg, mock_storage, mock_ollama, mock_file_hash):
+    """Test that re-uploading a recently inserted file is rejected without S3, Ollama or database calls"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    cursor.fetchone.side_effect = [None, {"id": TEST_PAPER_ID}]
+    mock_storage.upload_file.return_value = TEST_FILE_URL
+    mock_storage.S3UploadError = S3UploadError
+
+    with patch("modules.database.database.uuid7", return_value=TEST_PAPER_ID):
+        paper_insert(TEST_FILE_PATH, TEST_TITLE, TEST_AUTHORS)
+    mock_storage.reset_mock()
+    mock_ollama.reset_mock()
+    mock_psycopg.pool.reset_mock()
+
+    with pytest.raises(DuplicatePaperError, match=TEST_PAPER_ID):
+        paper_insert(TEST_FILE_PATH, TEST_TITLE, TEST_AUTHORS)
+
+    mock_storage.upload_file.assert_not_called()
+    mock_ollama.get_paper_embeddings.assert_not_called()
+    mock_psycopg.pool.connection.assert_not_called()
+
 
 def test_paper_update_success(mock_psycopg, sample_paper):
     """Test successful paper update"""
@@ -210,10 +358,22 @@ def test_paper_delete_success(mock_psycopg, mock_storage, sample_paper):
 
     paper_delete(TEST_PAPER_ID)
 
-    assert cursor.execute.call_count >= 3  # Should have 3 delete queries now (embeddings, references, paper)
+    cursor.execute.assert_called_once()  # Embeddings and references are removed by ON DELETE CASCADE
+    assert "DELETE FROM papers" in cursor.execute.call_args[0][0]
     mock_storage.delete_file.assert_called_once_with(TEST_FILE_URL)
 
 
+def test_paper_delete_evicts_cached_hash(mock_psycopg, mock_storage, sample_paper):
+    """Test that a deleted paper's file can be uploaded again"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    cursor.fetchone.return_value = sample_paper
+    _HASH_CACHE[TEST_FILE_HASH] = (float("inf"), {"id": TEST_PAPER_ID, "title": TEST_TITLE, "authors": TEST_AUTHORS})
+
+    paper_delete(TEST_PAPER_ID)
+
+    assert TEST_FILE_HASH not in _HASH_CACHE
+
+
 def test_paper_delete_not_found(mock_psycopg):
     """Test paper deletion when paper doesn't exist"""
     cursor = mock_psycopg.connect().cursor().__enter__()
@@ -226,14 +386,45 @@ def test_paper_delete_not_found(mock_psycopg):
 def test_paper_list_all(mock_psycopg, sample_paper):
     """Test paper listing with pagination"""
     cursor = mock_psycopg.connect().cursor().__enter__()
-    cursor.fetchone.return_value = {"total": 1}
-    cursor.fetchall.return_value = [sample_paper]
+    cursor.fetchall.return_value = [{**sample_paper, "total": 1}]
 
     result = paper_list_all(page=1, page_size=10)
     assert result["papers"] == [sample_paper]
     assert result["total"] == 1
     assert result["page"] == 1
     assert result["total_pages"] == 1
+    cursor.execute.assert_called_once()  # Page and total are fetched together
+
+
+def test_paper_list_all_with_cursor(mock_psycopg, sample_paper):
+    """Test keyset pagination continues after the given cursor"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    created_at = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    cursor.fetchall.return_value = [{**sample_paper, "created_at": created_at}]
+
+    result = paper_list_all(page=2, page_size=1, cursor=(TEST_PUBLISHED, "some-id"))
+
+    sql, params = cursor.execute.call_args[0]
+    assert "(created_at, id) < (%s, %s)" in sql
+    assert "OFFSET" not in sql
+    assert "COUNT" not in sql
+    assert params == (TEST_PUBLISHED, "some-id", 1)
+    cursor.execute.assert_called_once()
+    assert result["total"] is None
+    assert result["total_pages"] is None
+    assert result["next_cursor"] == (created_at, TEST_PAPER_ID)
+
+
+def test_paper_list_all_page_out_of_range(mock_psycopg):
+    """Test paper listing past the last page still reports the total"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    cursor.fetchall.return_value = []
+    cursor.fetchone.return_value = {"total": 3}
+
+    result = paper_list_all(page=5, page_size=2)
+    assert result["papers"] == []
+    assert result["total"] == 3
+    assert result["total_pages"] == 2
 
 
 def test_paper_get_similar_to_query(mock_psycopg, sample_paper):
@@ -248,6 +439,33 @@ def test_paper_get_similar_to_query(mock_psycopg, sample_paper):
     cursor.execute.assert_called_once()
 
 
+def test_paper_get_similar_to_query_binds_embedding_once(mock_psycopg):
+    """Test that the query embedding is sent as a single parameter"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    cursor.fetchall.return_value = []
+
+    query_embedding = [0.1, 0.2, 0.3]
+    paper_get_similar_to_query(query_embedding, limit=5, similarity_dropout=0.5)
+
+    sql, params = cursor.execute.call_args[0]
+    assert params == {"embedding": HalfVector(query_embedding), "dropout": 0.5, "limit": 5}
+    assert "ORDER BY similarity" in sql
+    assert "%(embedding)b" in sql
+    assert "::vector" not in sql
+    assert "pe.embedding," not in sql
+
+
+def test_paper_get_similar_to_query_include_embedding(mock_psycopg):
+    """Test that the stored embedding is only selected on request"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    cursor.fetchall.return_value = []
+
+    paper_get_similar_to_query([0.1, 0.2, 0.3], include_embedding=True)
+
+    sql = cursor.execute.call_args[0][0]
+    assert "pe.embedding," in sql
+
+
 def test_paper_references_insert_many(mock_psycopg):
     """Test inserting references for a paper"""
     cursor = mock_psycopg.connect().cursor().__enter__()
@@ -290,6 +508,72 @@ def test_paper_references_insert_many_no_paper(mock_psycopg):
         paper_references_insert_many(TEST_PAPER_ID, references)
 
 
+def test_paper_references_insert_many_attaches_paper_ids(mock_psycopg):
+    """Test that references processed concurrently get their own paper_id attached"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    cursor.fetchone.return_value = {"id": TEST_PAPER_ID}
+    cursor.rowcount = 3
+
+    references = [{"id": f"ref{i}", "title": f"Test Reference {i}", "eprint": f"2401.0000{i}"} for i in range(3)]
+    paper_ids = {"Test Reference 0": "paper-0", "Test Reference 2": "paper-2"}
+
+    with patch(
+        "modules.database.database._process_reference_with_arxiv_id",
+        side_effect=lambda ref, temp_dir: paper_ids.get(ref["title"]),
+    ):
+        paper_references_insert_many(TEST_PAPER_ID, references)
+
+    assert [ref.get("paper_id") for ref in references] == ["paper-0", None, "paper-2"]
+
+
+def test_paper_references_insert_many_processes_arxiv_id_once(mock_psycopg):
+    """Test that references citing the same arXiv paper download it once and share its paper_id"""
+    cursor = mock_psycopg.connect().cursor().__enter__()
+    cursor.fetchone.return_value = {"id": TEST_PAPER_ID}
+    cursor.rowcount = 3
+
+    references = [
+        {"id": "ref0", "title": "Test Reference", "eprint": "2401.11111"},
+        {"id": "ref1", "title": "Test Reference, again", "note": "arXiv:2401.11111"},
+        {"id": "ref2", "title": "Reference without arXiv ID"},
+    ]
+
+    with patch("modules.database.database._process_reference_with_arxiv_id", return_value="paper-0") as mock_process:
+        paper_references_insert_many(TEST_PAPER_ID, references)
+
+    mock_process.assert_called_once()
+    assert [ref.get("paper_id") for ref in references] == ["paper-0", "paper-0", None]
+
+
+def test_process_reference_with_arxiv_id_uses_first_id():
+    """Test that the first arXiv ID found in the reference fields is downloaded and inserted"""
+    reference = {
+        "id": "ref1",
+        "title": "Test Reference",
+        "author": "Author 1",
+        "eprint": "2401.11111",
+        "note": "see also 2402.22222",
+        "year": 2024,
+    }
+    with (
+        patch("modules.retriever.arxiv.arxiv_retriever.paper_download_arxiv_id", return_value=TEST_FILE_PATH) as mock_download,
+        patch("modules.retriever.arxiv.arxiv_retriever.paper_get_metadata", return_value={}),
+        patch("modules.database.database.paper_insert", return_value=TEST_PAPER_ID),
+    ):
+        result = _process_reference_with_arxiv_id(reference, "/tmp")
+
+    assert result == TEST_PAPER_ID
+    mock_download.assert_called_once_with("2401.11111", "/tmp")
+
+
+def test_process_reference_without_arxiv_id():
+    """Test that references without an arXiv ID are skipped"""
+    with patch("modules.retriever.arxiv.arxiv_retriever.paper_download_arxiv_id") as mock_download:
+        assert _process_reference_with_arxiv_id({"title": "Test Reference", "year": "2024"}, "/tmp") is None
+
+    mock_download.assert_not_called()
+
+
 def test_paper_references_list(mock_psycopg):
     """Test getting references for a paper"""
     cursor = mock_psycopg.connect().cursor().__enter__()
@@ -1,7 +1,13 @@
 import os
+import subprocess
 import pytest
 from unittest.mock import patch, MagicMock
-from modules.latex_parser.latex_content_parser import parse_latex_to_markdown, find_main_tex_file
+from modules.latex_parser.latex_content_parser import (
+    parse_latex_to_markdown,
+    find_main_tex_file,
+    _search_main_tex_file,
+    PandocError,
+)
 
 
 class TestFindMainTexFile:
@@ -56,6 +62,85 @@ class TestFindMainTexFile:
         assert os.path.basename(result) == "main.tex"
         assert nested_dir in result
 
+    @pytest.mark.parametrize("main_name", ["main.tex", "paper.tex", "{dir}.tex"])
+    def test_find_main_tex_file_prefers_likely_names(self, tmp_path, main_name):
+        """Test that usual main file names win over other standalone documents"""
+        main_name = main_name.format(dir=tmp_path.name)
+        for name in ("figure1.tex", main_name, "tables.tex"):
+            with open(os.path.join(tmp_path, name), "w") as f:
+                f.write(r"\documentclass{standalone}\begin{document}\end{document}")
+
+        result = find_main_tex_file(str(tmp_path))
+
+        assert os.path.basename(result) == main_name
+
+    def test_find_main_tex_file_prefers_top_level(self, tmp_path):
+        """Test that a top-level document wins over documents in subdirectories"""
+        os.makedirs(os.path.join(tmp_path, "figures"))
+        for path in (os.path.join(tmp_path, "figures", "main.tex"), os.path.join(tmp_path, "thesis.tex")):
+            with open(path, "w") as f:
+                f.write(r"\begin{document}\end{document}")
+
+        result = find_main_tex_file(str(tmp_path))
+
+        assert result == os.path.join(tmp_path, "thesis.tex")
+
+    def test_find_main_tex_file_among_many_fragments(self, tmp_path):
+        """Test finding the main LaTeX file after many fragments, skipping unreadable ones"""
+        for i in range(12):
+            with open(os.path.join(tmp_path, f"section{i}.tex"), "w") as f:
+                f.write(r"\section{Fragment}")
+        os.makedirs(os.path.join(tmp_path, "src"))
+        main_tex_path = os.path.join(tmp_path, "src", "thesis.tex")
+        with open(main_tex_path, "w") as f:
+            f.write(r"\begin{document}\end{document}")
+        os.symlink(os.path.join(tmp_path, "missing.tex"), os.path.join(tmp_path, "broken.tex"))
+
+        result = find_main_tex_file(str(tmp_path))
+
+        assert result == main_tex_path
+
+    def test_find_main_tex_file_cached(self, tmp_path):
+        """Test that a directory is only searched again after its entries change"""
+        main_tex_path = os.path.join(tmp_path, "main.tex")
+        with open(main_tex_path, "w") as f:
+            f.write(r"\begin{document}\end{document}")
+
+        with patch("modules.latex_parser.latex_content_parser._search_main_tex_file", wraps=_search_main_tex_file) as mock_search:
+            assert find_main_tex_file(str(tmp_path)) == main_tex_path
+            assert find_main_tex_file(str(tmp_path)) == main_tex_path
+            assert mock_search.call_count == 1
+
+            os.remove(main_tex_path)
+            assert find_main_tex_file(str(tmp_path)) is None
+            assert mock_search.call_count == 2
+
+    @pytest.mark.parametrize("skipped_dir", [".git", "build", "_minted-main"])
+    def test_find_main_tex_file_skips_hidden_and_build_directories(self, tmp_path, skipped_dir):
+        """Test that hidden and build directories are not searched"""
+        os.makedirs(os.path.join(tmp_path, skipped_dir))
+        with open(os.path.join(tmp_path, skipped_dir, "main.tex"), "w") as f:
+            f.write(r"\begin{document}")
+
+        result = find_main_tex_file(str(tmp_path))
+
+        assert result is None
+
+    def test_find_main_tex_file_does_not_follow_symlink_cycles(self, tmp_path):
+        """Test that symlinked directories, including ones looping back up the tree, are not searched"""
+        os.makedirs(os.path.join(tmp_path, "sections"))
+        fragment_path = os.path.join(tmp_path, "sections", "intro.tex")
+        with open(fragment_path, "w") as f:
+            f.write(r"\section{Introduction}")
+        os.symlink(tmp_path, os.path.join(tmp_path, "sections", "loop"))
+        os.symlink(os.path.join(tmp_path, "sections"), os.path.join(tmp_path, "sections-link"))
+
+        with patch("modules.latex_parser.latex_content_parser._is_main_tex_file", return_value=False) as mock_check:
+            result = _search_main_tex_file(str(tmp_path))
+
+        assert result is None
+        assert [call.args[0] for call in mock_check.call_args_list] == [fragment_path]
+
     def test_find_main_tex_file_not_found(self, tmp_path):
         """Test finding no main LaTeX file"""
         # Create a TeX file without document environment
@@ -71,6 +156,45 @@ class TestFindMainTexFile:
 
         assert result is None
 
+    def test_find_main_tex_file_large_preamble(self, tmp_path):
+        """Test finding the document marker after a large preamble"""
+        main_tex_path = os.path.join(tmp_path, "main.tex")
+        with open(main_tex_path, "wb") as f:
+            f.write(b"%" * (1024 * 1024 - 5) + rb"\begin{document}" + b"\n")
+
+        result = find_main_tex_file(str(tmp_path))
+
+        assert result == main_tex_path
+
+    def test_find_main_tex_file_not_utf8(self, tmp_path):
+        """Test that a main LaTeX file that is not valid UTF-8 is skipped in favour of the next candidate"""
+        with open(os.path.join(tmp_path, "main.tex"), "wb") as f:
+            f.write("% Übersicht\n\\begin{document}\n".encode("latin-1"))
+        other_tex_path = os.path.join(tmp_path, "other.tex")
+        with open(other_tex_path, "w", encoding="utf-8") as f:
+            f.write("% Übersicht\n\\begin{document}\n")
+
+        result = find_main_tex_file(str(tmp_path))
+
+        assert result == other_tex_path
+
+    def test_find_main_tex_file_only_not_utf8(self, tmp_path):
+        """Test that no main file is found if the only candidate is not valid UTF-8"""
+        with open(os.path.join(tmp_path, "main.tex"), "wb") as f:
+            f.write("% Übersicht\n\\begin{document}\n".encode("latin-1"))
+
+        result = find_main_tex_file(str(tmp_path))
+
+        assert result is None
+
+    def test_find_main_tex_file_skips_empty_files(self, tmp_path):
+        """Test that empty tex files are skipped"""
+        open(os.path.join(tmp_path, "main.tex"), "w").close()
+
+        result = find_main_tex_file(str(tmp_path))
+
+        assert result is None
+
     def test_find_main_tex_file_unicode_error(self, tmp_path):
         """Test handling Unicode decode errors gracefully"""
         with patch("builtins.open", side_effect=[UnicodeDecodeError("utf-8", b"", 0, 1, "Test error")]):
@@ -87,13 +211,11 @@ class TestFindMainTexFile:
 class TestParseLatexToMarkdown:
     """Tests for the parse_latex_to_markdown function"""
 
-    @patch("modules.latex_parser.latex_content_parser.pandoc")
-    def test_parse_latex_to_markdown_file_success(self, mock_pandoc, tmp_path):
+    @patch("modules.latex_parser.latex_content_parser.subprocess.run")
+    def test_parse_latex_to_markdown_file_success(self, mock_run, tmp_path):
         """Test successful conversion of a LaTeX file to Markdown"""
         # Set up the mock to return expected markdown
-        mock_doc = MagicMock()
-        mock_pandoc.read.return_value = mock_doc
-        mock_pandoc.write.return_value = "# Converted Markdown\n\nTest content"
+        mock_run.return_value = MagicMock(stdout=b"# Converted Markdown\n\nTest content")
 
         # Create a test LaTeX file
         test_file = os.path.join(tmp_path, "test.tex")
@@ -113,19 +235,17 @@ class TestParseLatexToMarkdown:
         assert "# Converted Markdown" in result
         assert "Test content" in result
 
-        # Verify pandoc was called correctly
-        mock_pandoc.read.assert_called_once()
-        mock_pandoc.write.assert_called_once_with(mock_doc, format="markdown")
+        # Verify pandoc was run once, straight from LaTeX to Markdown
+        mock_run.assert_called_once()
+        assert mock_run.call_args.args[0] == ["pandoc", "--from", "latex", "--to", "markdown", "--wrap=none", "test.tex"]
 
     @patch("modules.latex_parser.latex_content_parser.find_main_tex_file")
-    @patch("modules.latex_parser.latex_content_parser.pandoc")
-    def test_parse_latex_to_markdown_directory_success(self, mock_pandoc, mock_find_file, tmp_path):
+    @patch("modules.latex_parser.latex_content_parser.subprocess.run")
+    def test_parse_latex_to_markdown_directory_success(self, mock_run, mock_find_file, tmp_path):
         """Test successful conversion from a directory containing LaTeX files"""
         # Set up mocks
         mock_find_file.return_value = os.path.join(tmp_path, "main.tex")
-        mock_doc = MagicMock()
-        mock_pandoc.read.return_value = mock_doc
-        mock_pandoc.write.return_value = "# Converted from Directory\n\nTest content"
+        mock_run.return_value = MagicMock(stdout=b"# Converted from Directory\n\nTest content")
 
         # Create the test directory
         os.makedirs(tmp_path, exist_ok=True)
@@ -139,7 +259,7 @@ class TestParseLatexToMarkdown:
 
         # Verify our mocks were called correctly
         mock_find_file.assert_called_once_with(str(tmp_path))
-        mock_pandoc.read.assert_called_once()
+        mock_run.assert_called_once()
 
     def test_parse_latex_to_markdown_file_not_found(self):
         """Test handling of a file that doesn't exist"""
@@ -155,8 +275,8 @@ class TestParseLatexToMarkdown:
         with pytest.raises(FileNotFoundError):
             parse_latex_to_markdown(str(tmp_path))
 
-    @patch("modules.latex_parser.latex_content_parser.pandoc")
-    def test_parse_latex_to_markdown_conversion_error(self, mock_pandoc, tmp_path):
+    @patch("modules.latex_parser.latex_content_parser.subprocess.run")
+    def test_parse_latex_to_markdown_conversion_error(self, mock_run, tmp_path):
         """Test handling of pandoc conversion errors"""
         # Create a test file
         test_file = os.path.join(tmp_path, "error.tex")
@@ -164,27 +284,66 @@ class TestParseLatexToMarkdown:
             f.write(r"\documentclass{article}\begin{document}Test\end{document}")
 
         # Set up mock to raise an exception during conversion
-        mock_pandoc.read.side_effect = Exception("Pandoc conversion error")
+        mock_run.side_effect = subprocess.CalledProcessError(64, "pandoc", stderr=b"Pandoc conversion error")
 
         # Test the function
-        with pytest.raises(Exception, match="Pandoc conversion error"):
+        with pytest.raises(PandocError, match="Pandoc conversion error"):
             parse_latex_to_markdown(test_file)
 
-    @patch("os.chdir")
-    def test_parse_latex_to_markdown_directory_change_error(self, mock_chdir, tmp_path):
-        """Test handling of errors when changing directories"""
-        # Create a test file
+    @patch("modules.latex_parser.latex_content_parser.subprocess.run", side_effect=FileNotFoundError("pandoc"))
+    def test_parse_latex_to_markdown_pandoc_not_installed(self, mock_run, tmp_path):
+        """Test that a missing pandoc binary is reported as a conversion error"""
         test_file = os.path.join(tmp_path, "test.tex")
         with open(test_file, "w") as f:
             f.write(r"\documentclass{article}\begin{document}Test\end{document}")
 
-        # Set up mock to raise an exception during directory change
-        mock_chdir.side_effect = OSError("Permission denied")
+        with pytest.raises(PandocError, match="not installed"):
+            parse_latex_to_markdown(test_file)
+
+    @patch("modules.latex_parser.latex_content_parser.subprocess.run")
+    def test_parse_latex_to_markdown_runs_in_file_directory(self, mock_run, tmp_path):
+        """Test that pandoc runs in the LaTeX file's directory without changing the process working directory"""
+        test_file = os.path.join(tmp_path, "test.tex")
+        with open(test_file, "w") as f:
+            f.write(r"\documentclass{article}\begin{document}Test\end{document}")
+        mock_run.return_value = MagicMock(stdout=b"Test")
+
+        with patch("os.chdir") as mock_chdir:
+            parse_latex_to_markdown(test_file)
+
+        assert mock_run.call_args.kwargs["cwd"] == str(tmp_path)
+        mock_chdir.assert_not_called()
+
+    @patch("modules.latex_parser.latex_content_parser.subprocess.run", side_effect=PermissionError("Permission denied"))
+    def test_parse_latex_to_markdown_directory_access_error(self, mock_run, tmp_path):
+        """Test handling of errors when pandoc cannot be started in the file's directory"""
+        test_file = os.path.join(tmp_path, "test.tex")
+        with open(test_file, "w") as f:
+            f.write(r"\documentclass{article}\begin{document}Test\end{document}")
 
-        # Test the function
         with pytest.raises(OSError, match="Permission denied"):
             parse_latex_to_markdown(test_file)
 
+    @patch("modules.latex_parser.latex_content_parser._pandoc_version", return_value="pandoc 3.1")
+    @patch("modules.latex_parser.latex_content_parser.subprocess.run")
+    def test_parse_latex_to_markdown_cached(self, mock_run, mock_version, tmp_path):
+        """Test that converted Markdown is reused until one of the LaTeX sources changes"""
+        source_dir = tmp_path / "source"
+        source_dir.mkdir()
+        (source_dir / "main.tex").write_text(r"\begin{document}\input{intro}\end{document}")
+        (source_dir / "intro.tex").write_text("Introduction")
+        mock_run.return_value = MagicMock(stdout=b"Introduction")
+
+        with patch("modules.latex_parser.latex_content_parser.LATEX_PARSER_CACHE", str(tmp_path / "cache")):
+            assert parse_latex_to_markdown(str(source_dir / "main.tex")) == "Introduction"
+            assert parse_latex_to_markdown(str(source_dir / "main.tex")) == "Introduction"
+            assert mock_run.call_count == 1
+
+            (source_dir / "intro.tex").write_text("Revised introduction")
+            mock_run.return_value = MagicMock(stdout=b"Revised introduction")
+            assert parse_latex_to_markdown(str(source_dir / "main.tex")) == "Revised introduction"
+            assert mock_run.call_count == 2
+
     def test_parse_latex_to_markdown_cleanup(self, tmp_path):
         """Test that the original directory is restored even if errors occur"""
         # Create a test file
@@ -196,7 +355,7 @@ class TestParseLatexToMarkdown:
         original_dir = os.getcwd()
 
         # Call with exception patched in
-        with patch("modules.latex_parser.latex_content_parser.pandoc.read", side_effect=Exception("Test exception")):
+        with patch("modules.latex_parser.latex_content_parser.subprocess.run", side_effect=Exception("Test exception")):
             with pytest.raises(Exception, match="Test exception"):
                 parse_latex_to_markdown(test_file)
 
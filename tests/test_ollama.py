@@ -1,15 +1,33 @@
 import os
+import sqlite3
 import pytest
+from datetime import date
 import numpy as np
+import ollama
+import pymupdf
 from unittest.mock import patch, MagicMock
 from modules.ollama.ollama_client import (
     get_paper_embeddings,
     get_query_embeddings,
-    # get_paper_info,
+    get_paper_info,
     _send_embed_request_to_ollama,
+    _send_embed_batch_to_ollama,
+    _initialize_module,
+    _get_client,
+    _get_instructor_client,
+    _EMBED_CACHE,
+    _METADATA_CACHE,
+    OLLAMA_API_TIMEOUT,
+    OLLAMA_EMBED_BATCH_SIZE,
     OLLAMA_EMBEDDING_MODEL,
+    OLLAMA_KEEPALIVE_EXPIRY,
+    OLLAMA_MAX_RETRIES,
+    OLLAMA_MAX_RETRY_DELAY,
+    OLLAMA_RETRY_DELAY,
 )
-from modules.ollama.pdf_extractor import extract_text_from_pdf
+from modules.ollama import ollama_client
+from modules.ollama.pydantic_classes import PaperMetadata
+from modules.ollama.pdf_extractor import extract_pdf_content, extract_text_from_pdf, load_pdf_text
 
 # Set test environment variable to prevent module initialization
 os.environ["PYTEST_RUNNING"] = "1"
@@ -18,19 +36,14 @@ os.environ["PYTEST_RUNNING"] = "1"
 @pytest.fixture(autouse=True)
 def mock_module_globals():
     """Mock module-level globals for all tests"""
-    with (
-        patch("modules.ollama.ollama_client.TOKENIZER") as mock_tokenizer,
-        patch("modules.ollama.ollama_client.OLLAMA_CLIENT") as mock_ollama_client,
-    ):
-        # Set up mock tokenizer
-        mock_encoded = MagicMock()
-        mock_encoded.__getitem__.return_value = np.array([1, 2, 3])
-        mock_tokenizer.encode.return_value = mock_encoded
-
+    _EMBED_CACHE.clear()
+    _METADATA_CACHE.clear()
+    with patch("modules.ollama.ollama_client.OLLAMA_CLIENT") as mock_ollama_client:
         # Set up mock Ollama client
         mock_ollama_client.embeddings.return_value = {"embedding": [0.1, 0.2, 0.3]}
+        mock_ollama_client.embed.side_effect = lambda model, input: {"embeddings": [[0.1, 0.2, 0.3]] * len(input)}
 
-        yield mock_tokenizer, mock_ollama_client
+        yield mock_ollama_client
 
 
 @pytest.fixture
@@ -45,7 +58,7 @@ def test_pdf():
 
 def test_send_embed_request_success(mock_module_globals):
     """Test successful embedding request"""
-    _, mock_ollama_client = mock_module_globals
+    mock_ollama_client = mock_module_globals
     result = _send_embed_request_to_ollama("test prompt", OLLAMA_EMBEDDING_MODEL)
     assert result == [0.1, 0.2, 0.3]
     mock_ollama_client.embeddings.assert_called_once()
@@ -53,45 +66,319 @@ def test_send_embed_request_success(mock_module_globals):
 
 def test_send_embed_request_failure(mock_module_globals):
     """Test handling of failed embedding request"""
-    _, mock_ollama_client = mock_module_globals
+    mock_ollama_client = mock_module_globals
     mock_ollama_client.embeddings.side_effect = Exception("Connection failed")
-    result = _send_embed_request_to_ollama("test prompt", OLLAMA_EMBEDDING_MODEL)
+    with patch("modules.ollama.ollama_client.time.sleep") as mock_sleep:
+        result = _send_embed_request_to_ollama("test prompt", OLLAMA_EMBEDDING_MODEL)
     assert result is None
+    # Retries wait a random delay of up to the capped exponential backoff
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    assert len(delays) == OLLAMA_MAX_RETRIES - 1
+    for attempt, delay in enumerate(delays):
+        assert 0 <= delay <= min(OLLAMA_RETRY_DELAY * 2**attempt, OLLAMA_MAX_RETRY_DELAY)
+
+
+def test_send_embed_request_client_error_not_retried(mock_module_globals):
+    """Test that a 4xx response, e.g. for an unknown model, is not retried"""
+    mock_ollama_client = mock_module_globals
+    mock_ollama_client.embeddings.side_effect = ollama.ResponseError("model not found", 404)
+    with patch("modules.ollama.ollama_client.time.sleep") as mock_sleep:
+        result = _send_embed_request_to_ollama("test prompt", OLLAMA_EMBEDDING_MODEL)
+    assert result is None
+    mock_ollama_client.embeddings.assert_called_once()
+    mock_sleep.assert_not_called()
 
 
-def test_extract_text_from_pdf(test_pdf):
-    """Test PDF text extraction"""
-    with patch("modules.ollama.pdf_extractor.partition_pdf") as mock_partition_pdf:
-        # Create mock elements that will work properly with str() conversion
-        element1 = MagicMock()
-        element1.__str__.return_value = "test"
-        element2 = MagicMock()
-        element2.__str__.return_value = "pdf"
-        element3 = MagicMock()
-        element3.__str__.return_value = "content"
+def test_send_embed_requests_without_retries(mock_module_globals):
+    """Test that no request is sent and None is returned when OLLAMA_MAX_RETRIES is 0"""
+    mock_ollama_client = mock_module_globals
+    with patch("modules.ollama.ollama_client.OLLAMA_MAX_RETRIES", 0):
+        assert _send_embed_request_to_ollama("test prompt", OLLAMA_EMBEDDING_MODEL) is None
+        assert _send_embed_batch_to_ollama(["test prompt"], OLLAMA_EMBEDDING_MODEL) is None
+    mock_ollama_client.embeddings.assert_not_called()
+    mock_ollama_client.embed.assert_not_called()
+
+
+@pytest.mark.parametrize("error, status_code", [("404 page not found", 404), ("method not allowed", 405)])
+def test_send_embed_batch_falls_back_to_single_requests(mock_module_globals, error, status_code):
+    """Test that texts are embedded one by one when the server has no batch embed endpoint"""
+    mock_ollama_client = mock_module_globals
+    mock_ollama_client.embed.side_effect = ollama.ResponseError(error, status_code)
+    mock_ollama_client.embeddings.side_effect = lambda model, prompt: {"embedding": [float(prompt)]}
+
+    result = _send_embed_batch_to_ollama(["1", "2"], OLLAMA_EMBEDDING_MODEL)
+
+    assert [e.tolist() for e in result] == [[1.0], [2.0]]
+    mock_ollama_client.embed.assert_called_once()
+    assert mock_ollama_client.embeddings.call_count == 2
+
+
+def test_send_embed_batch_model_not_found(mock_module_globals):
+    """Test that a missing model fails the batch instead of falling back to single requests"""
+    mock_ollama_client = mock_module_globals
+    mock_ollama_client.embed.side_effect = ollama.ResponseError('model "mxbai-embed-large" not found, try pulling it first', 404)
+
+    assert _send_embed_batch_to_ollama(["1", "2"], OLLAMA_EMBEDDING_MODEL) is None
+    mock_ollama_client.embed.assert_called_once()
+    mock_ollama_client.embeddings.assert_not_called()
+
+
+def test_send_embed_request_cached(mock_module_globals):
+    """Test that a text embedded before is answered from the cache"""
+    mock_ollama_client = mock_module_globals
+    assert _send_embed_request_to_ollama("test prompt", OLLAMA_EMBEDDING_MODEL) == [0.1, 0.2, 0.3]
+    # Cached embeddings are kept as float32
+    assert _send_embed_request_to_ollama("test prompt", OLLAMA_EMBEDDING_MODEL) == pytest.approx([0.1, 0.2, 0.3])
+    mock_ollama_client.embeddings.assert_called_once()
+
+
+def test_send_embed_batch_only_sends_uncached(mock_module_globals):
+    """Test that a batch only sends the texts that are not cached yet, and keeps input order"""
+    mock_ollama_client = mock_module_globals
+    mock_ollama_client.embed.side_effect = lambda model, input: {"embeddings": [[float(text)] for text in input]}
+
+    assert [e.tolist() for e in _send_embed_batch_to_ollama(["1", "2"], OLLAMA_EMBEDDING_MODEL)] == [[1.0], [2.0]]
+    assert [e.tolist() for e in _send_embed_batch_to_ollama(["1", "3", "2"], OLLAMA_EMBEDDING_MODEL)] == [[1.0], [3.0], [2.0]]
+
+    assert mock_ollama_client.embed.call_args_list[-1].kwargs["input"] == ["3"]
+    _send_embed_batch_to_ollama(["3", "2"], OLLAMA_EMBEDDING_MODEL)
+    assert mock_ollama_client.embed.call_count == 2
+
+
+def test_send_embed_request_persistent_cache(mock_module_globals, tmp_path):
+    """Test that embeddings written to the persistent cache are found after the in-process cache is cleared"""
+    mock_ollama_client = mock_module_globals
+    with (
+        patch("modules.ollama.ollama_client.OLLAMA_EMBED_CACHE_PATH", str(tmp_path / "embeddings.db")),
+        patch("modules.ollama.ollama_client._EMBED_CACHE_DB", None),
+    ):
+        assert _send_embed_request_to_ollama("test prompt", OLLAMA_EMBEDDING_MODEL) == [0.1, 0.2, 0.3]
+        _EMBED_CACHE.clear()
+        result = _send_embed_request_to_ollama("test prompt", OLLAMA_EMBEDDING_MODEL)
+
+    # Stored as float32
+    assert result == pytest.approx([0.1, 0.2, 0.3])
+    mock_ollama_client.embeddings.assert_called_once()
+
+
+def test_send_embed_request_persistent_cache_unavailable(mock_module_globals, tmp_path):
+    """Test that a persistent cache that cannot be opened is disabled without changing its configured path"""
+    mock_ollama_client = mock_module_globals
+    cache_path = str(tmp_path / "missing" / "embeddings.db")
+    with (
+        patch("modules.ollama.ollama_client.OLLAMA_EMBED_CACHE_PATH", cache_path),
+        patch("modules.ollama.ollama_client._EMBED_CACHE_DB", None),
+        patch("modules.ollama.ollama_client._EMBED_CACHE_DB_DISABLED", False),
+        patch("modules.ollama.ollama_client.sqlite3.connect", side_effect=sqlite3.OperationalError("unable to open database file")) as mock_connect,
+    ):
+        assert _send_embed_request_to_ollama("first prompt", OLLAMA_EMBEDDING_MODEL) == [0.1, 0.2, 0.3]
+        assert _send_embed_request_to_ollama("second prompt", OLLAMA_EMBEDDING_MODEL) == [0.1, 0.2, 0.3]
 
-        mock_partition_pdf.return_value = [element1, element2, element3]
+        assert ollama_client.OLLAMA_EMBED_CACHE_PATH == cache_path
+        assert ollama_client._EMBED_CACHE_DB_DISABLED
 
-        extracted_text = extract_text_from_pdf(test_pdf)
-        assert "test\npdf\ncontent" == extracted_text
-        mock_partition_pdf.assert_called_once_with(filename=test_pdf)
+    mock_connect.assert_called_once()
+    assert mock_ollama_client.embeddings.call_count == 2
+
+
+def test_initialize_module_reuses_connections():
+    """Test that the Ollama client is created once with a timeout and a keep-alive connection pool"""
+    with patch("modules.ollama.ollama_client.ollama") as mock_ollama:
+        _initialize_module()
+
+    mock_ollama.Client.assert_called_once()
+    assert mock_ollama.Client.return_value.pull.call_count == 2
+    client_options = mock_ollama.Client.call_args.kwargs
+    assert client_options["timeout"] == OLLAMA_API_TIMEOUT
+    assert client_options["limits"].max_keepalive_connections > 0
+    assert client_options["limits"].keepalive_expiry == OLLAMA_KEEPALIVE_EXPIRY
+
+
+def test_get_client_initializes_once():
+    """Test that the Ollama client is created on first use only"""
+    with (
+        patch("modules.ollama.ollama_client.OLLAMA_CLIENT", None),
+        patch("modules.ollama.ollama_client.ollama") as mock_ollama,
+    ):
+        assert _get_client() is mock_ollama.Client.return_value
+        assert _get_client() is mock_ollama.Client.return_value
+
+    mock_ollama.Client.assert_called_once()
+
+
+def test_get_paper_info_fake_metadata():
+    """Test that placeholder metadata is returned while OLLAMA_FAKE_METADATA is enabled"""
+    with (
+        patch("modules.ollama.ollama_client.OLLAMA_FAKE_METADATA", True),
+        patch("modules.ollama.ollama_client.instructor") as mock_instructor,
+    ):
+        result = get_paper_info("nonexistent.pdf")
+
+    assert result["title"] == "Sample Academic Paper Title"
+    mock_instructor.from_openai.assert_not_called()
+
+
+def test_get_paper_info_file_not_found_without_fake_metadata():
+    """Test that metadata extraction reports a missing file once OLLAMA_FAKE_METADATA is disabled"""
+    with patch("modules.ollama.ollama_client.OLLAMA_FAKE_METADATA", False), pytest.raises(FileNotFoundError):
+        get_paper_info("nonexistent.pdf")
+
+
+def test_get_paper_info_uses_given_first_page_text():
+    """Test that metadata extraction does not reopen the PDF when its first page text is passed in"""
+    with (
+        patch("modules.ollama.ollama_client.OLLAMA_FAKE_METADATA", False),
+        patch("modules.ollama.ollama_client._get_instructor_client") as mock_get_instructor_client,
+        patch("modules.ollama.ollama_client.pymupdf") as mock_pymupdf,
+    ):
+        mock_create = mock_get_instructor_client.return_value.chat.completions.create
+        mock_create.return_value.model_dump_json.return_value = '{"title": "Extracted Title"}'
+
+        result = get_paper_info("nonexistent.pdf", first_page_text="First page of the paper")
+
+    assert result == {"title": "Extracted Title"}
+    assert "First page of the paper" in mock_create.call_args.kwargs["messages"][0]["content"]
+    mock_pymupdf.open.assert_not_called()
+
+
+def test_get_paper_info_cached_by_first_page():
+    """Test that metadata is extracted once per first page and then served from the cache"""
+    metadata = PaperMetadata.model_construct(
+        title="Cached Paper Title",
+        authors=["Jane Smith"],
+        publication_date=date(2024, 1, 31),
+        keywords=["caching", "metadata", "papers"],
+    )
+    with (
+        patch("modules.ollama.ollama_client.OLLAMA_FAKE_METADATA", False),
+        patch("modules.ollama.ollama_client._get_client"),
+        patch("modules.ollama.ollama_client._get_instructor_client") as mock_get_instructor_client,
+    ):
+        mock_create = mock_get_instructor_client.return_value.chat.completions.create
+        mock_create.return_value = metadata
+
+        first = get_paper_info("first.pdf", first_page_text="Same first page")
+        second = get_paper_info("second.pdf", first_page_text="Same first page")
+
+    assert first == second == {**metadata.model_dump(), "publication_date": "2024-01-31"}
+    mock_create.assert_called_once()
+
+
+def test_get_paper_info_first_page_without_text_not_cached():
+    """Test that papers whose first page has no text do not share cached metadata"""
+    first_metadata = PaperMetadata.model_construct(title="First Scanned Paper", authors=["Jane Smith"])
+    second_metadata = PaperMetadata.model_construct(title="Second Scanned Paper", authors=["John Doe"])
+    with (
+        patch("modules.ollama.ollama_client.OLLAMA_FAKE_METADATA", False),
+        patch("modules.ollama.ollama_client._get_client"),
+        patch("modules.ollama.ollama_client._get_instructor_client") as mock_get_instructor_client,
+    ):
+        mock_create = mock_get_instructor_client.return_value.chat.completions.create
+        mock_create.side_effect = [first_metadata, second_metadata]
+
+        first = get_paper_info("first.pdf", first_page_text="")
+        second = get_paper_info("second.pdf", first_page_text="  \n")
+
+    assert first["title"] == "First Scanned Paper"
+    assert second["title"] == "Second Scanned Paper"
+    assert mock_create.call_count == 2
+    assert not _METADATA_CACHE
+
+
+def test_get_instructor_client_reused():
+    """Test that the instructor client for metadata extraction is created once"""
+    with (
+        patch("modules.ollama.ollama_client._INSTRUCTOR_CLIENT", None),
+        patch("modules.ollama.ollama_client.instructor") as mock_instructor,
+    ):
+        assert _get_instructor_client() is _get_instructor_client()
+
+    mock_instructor.from_openai.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "page_text, expected_strategy",
+    [("Born-digital paper text. " * 20, "fast"), ("", "hi_res")],
+)
+def test_extract_pdf_content_strategy(tmp_path, page_text, expected_strategy):
+    """Test that PDFs with a text layer are partitioned with the fast strategy and scans with hi_res"""
+    pdf_path = str(tmp_path / "test.pdf")
+    doc = pymupdf.open()
+    doc.new_page().insert_textbox(pymupdf.Rect(72, 72, 540, 720), page_text)
+    doc.save(pdf_path)
+    doc.close()
+
+    with patch("modules.ollama.pdf_extractor.partition_pdf", return_value=[]) as mock_partition_pdf:
+        assert extract_pdf_content(pdf_path) == []
+
+    assert mock_partition_pdf.call_args.kwargs["strategy"] == expected_strategy
+
+
+def test_extract_pdf_content_links_titles(test_pdf):
+    """Test that titles are linked to their previous and next title"""
+
+    class Title:
+        def __init__(self, text):
+            self.text = text
+
+    class NarrativeText(Title):
+        pass
+
+    elements = [Title("Introduction"), NarrativeText("Body"), Title("Method"), Title("Results")]
+    chunk = MagicMock()
+    chunk.metadata.orig_elements = elements
+    chunk.metadata.page_number = 1
+
+    with patch("modules.ollama.pdf_extractor.partition_pdf", return_value=[chunk]):
+        content = extract_pdf_content(test_pdf, strategy="fast")
+
+    titles = [item for item in content if item["type"] == "Title"]
+    assert [(t["prev_title"], t["content"], t["next_title"]) for t in titles] == [
+        (None, "Introduction", "Method"),
+        ("Introduction", "Method", "Results"),
+        ("Method", "Results", ""),
+    ]
+    assert content[1]["current_chapter"] == "Introduction"
+
+
+def test_extract_text_from_pdf(tmp_path):
+    """Test PDF text extraction"""
+    pdf_path = str(tmp_path / "test.pdf")
+    doc = pymupdf.open()
+    for text in ("test", "pdf", "content"):
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(pdf_path)
+    doc.close()
+
+    extracted_text = extract_text_from_pdf(pdf_path)
+    assert [line for line in extracted_text.splitlines() if line] == ["test", "pdf", "content"]
 
 
 def test_extract_text_from_pdf_file_not_found():
     """Test handling of non-existent PDF file"""
-    with patch("modules.ollama.pdf_extractor.partition_pdf") as mock_partition_pdf:
-        mock_partition_pdf.side_effect = FileNotFoundError("File not found")
-        with pytest.raises(FileNotFoundError):
-            extract_text_from_pdf("nonexistent.pdf")
+    with pytest.raises(FileNotFoundError):
+        extract_text_from_pdf("nonexistent.pdf")
+
+
+def test_load_pdf_text(tmp_path):
+    """Test that the full text and the first page are extracted together"""
+    pdf_path = str(tmp_path / "test.pdf")
+    doc = pymupdf.open()
+    for text in ("first", "second"):
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(pdf_path)
+    doc.close()
+
+    full_text, first_page_text = load_pdf_text(pdf_path)
+    assert full_text == extract_text_from_pdf(pdf_path)
+    assert first_page_text.strip() == "first"
 
 
 def test_get_paper_embeddings_success(mock_module_globals, test_pdf):
     """Test successful paper embedding generation"""
-    _, mock_ollama_client = mock_module_globals
-
     with patch("modules.ollama.ollama_client.extract_pdf_content") as mock_extract_pdf_content:
         # Mock the extract_pdf_content function to return a list of content chunks
-        mock_extract_pdf_content.return_value = [{"content": "test content"}]
+        mock_extract_pdf_content.return_value = [{"content": "This is a test paragraph with enough content to embed."}]
 
         result = get_paper_embeddings(test_pdf)
         assert isinstance(result, dict)
@@ -102,23 +389,100 @@ def test_get_paper_embeddings_success(mock_module_globals, test_pdf):
         mock_extract_pdf_content.assert_called_once_with(test_pdf)
 
 
+def test_get_paper_embeddings_keeps_segment_order(mock_module_globals, test_pdf):
+    """Test that concurrently generated embeddings are returned in segment order"""
+    mock_ollama_client = mock_module_globals
+    mock_ollama_client.embed.side_effect = lambda model, input: {"embeddings": [[float(text.split()[0])] for text in input]}
+    segment_count = 3 * OLLAMA_EMBED_BATCH_SIZE + 1
+
+    with patch("modules.ollama.ollama_client.extract_pdf_content") as mock_extract_pdf_content:
+        mock_extract_pdf_content.return_value = [{"content": f"{i} is the number of this test paragraph"} for i in range(segment_count)]
+
+        result = get_paper_embeddings(test_pdf)
+
+    assert result["embeddings"].dtype == np.float32
+    assert result["embeddings"].tolist() == [[float(i)] for i in range(segment_count)]
+    # Segments are sent in batches rather than one request each
+    assert mock_ollama_client.embed.call_count == 4
+    mock_ollama_client.embeddings.assert_not_called()
+
+
+def test_get_paper_embeddings_batches_by_length(mock_module_globals, test_pdf):
+    """Test that segments of similar length are batched together"""
+    mock_ollama_client = mock_module_globals
+    mock_ollama_client.embed.side_effect = lambda model, input: {"embeddings": [[float(len(text))] for text in input]}
+    lengths = [40 + (i * 7) % (2 * OLLAMA_EMBED_BATCH_SIZE) for i in range(2 * OLLAMA_EMBED_BATCH_SIZE)]
+
+    with (
+        patch("modules.ollama.ollama_client.OLLAMA_EMBED_CONCURRENCY", 1),
+        patch("modules.ollama.ollama_client.extract_pdf_content") as mock_extract_pdf_content,
+    ):
+        mock_extract_pdf_content.return_value = [{"content": "x" * length} for length in lengths]
+
+        result = get_paper_embeddings(test_pdf)
+
+    sent_lengths = [len(text) for call in mock_ollama_client.embed.call_args_list for text in call.kwargs["input"]]
+    assert sent_lengths == sorted(lengths, reverse=True)
+    assert result["embeddings"].tolist() == [[length] for length in lengths]
+
+
+def test_get_paper_embeddings_embeds_repeated_segments_once(mock_module_globals, test_pdf):
+    """Test that repeated segments are embedded once and their embedding reused"""
+    mock_ollama_client = mock_module_globals
+    mock_ollama_client.embed.side_effect = lambda model, input: {"embeddings": [[float(len(text))] for text in input]}
+
+    header = "Journal of Test Studies, Volume 1"
+    body = "The body paragraph of the test paper."
+
+    with patch("modules.ollama.ollama_client.extract_pdf_content") as mock_extract_pdf_content:
+        mock_extract_pdf_content.return_value = [{"content": text} for text in (header, body, header.upper() + " ", header.lower())]
+
+        result = get_paper_embeddings(test_pdf)
+
+    assert result["embeddings"].tolist() == [[len(header)], [len(body)], [len(header)], [len(header)]]
+    mock_ollama_client.embed.assert_called_once_with(model=OLLAMA_EMBEDDING_MODEL, input=[body, header])
+
+
+def test_get_paper_embeddings_skips_short_segments(mock_module_globals, test_pdf):
+    """Test that empty segments and short fragments are not embedded"""
+    mock_ollama_client = mock_module_globals
+    body = "The body paragraph of the test paper."
+
+    with patch("modules.ollama.ollama_client.extract_pdf_content") as mock_extract_pdf_content:
+        mock_extract_pdf_content.return_value = [{"content": None}, {"content": "  "}, {"content": "12"}, {"content": body}]
+
+        result = get_paper_embeddings(test_pdf)
+
+    assert len(result["embeddings"]) == 1
+    mock_ollama_client.embed.assert_called_once_with(model=OLLAMA_EMBEDDING_MODEL, input=[body])
+
+
+def test_send_embed_batch_invalid_response(mock_module_globals):
+    """Test that a batch response with a missing embedding is retried and then rejected"""
+    mock_ollama_client = mock_module_globals
+    mock_ollama_client.embed.side_effect = None
+    mock_ollama_client.embed.return_value = {"embeddings": [[0.1, 0.2, 0.3]]}
+    with patch("modules.ollama.ollama_client.time.sleep"):
+        result = _send_embed_batch_to_ollama(["first", "second"], OLLAMA_EMBEDDING_MODEL)
+    assert result is None
+    assert mock_ollama_client.embed.call_count == OLLAMA_MAX_RETRIES
+
+
 def test_get_paper_embeddings_empty_pdf(mock_module_globals, test_pdf):
     """Test handling of empty PDF content"""
-    _, mock_ollama_client = mock_module_globals
-
     with patch("modules.ollama.ollama_client.extract_pdf_content") as mock_extract_pdf_content:
         # Mock the extract_pdf_content function to return an empty list
         mock_extract_pdf_content.return_value = []
 
         result = get_paper_embeddings(test_pdf)
-        assert result["embeddings"] == []
+        assert len(result["embeddings"]) == 0
 
         mock_extract_pdf_content.assert_called_once_with(test_pdf)
 
 
 def test_get_query_embeddings_success(mock_module_globals):
     """Test successful query embedding generation"""
-    _, mock_ollama_client = mock_module_globals
+    mock_ollama_client = mock_module_globals
     result = get_query_embeddings("test query")
     assert result == [0.1, 0.2, 0.3]
     mock_ollama_client.embeddings.assert_called_once()
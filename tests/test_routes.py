@@ -1,6 +1,10 @@
 # tests/test_routes.py
 
+import base64
 import io
+import datetime
+import pytest
+from urllib.parse import quote
 from unittest.mock import patch
 from app.routes import (
     PaperNotFoundError,
@@ -227,6 +231,44 @@ def test_list_papers_pagination(client, mock_db):
     assert response.json["total_pages"] == 3
 
 
+def test_list_papers_with_cursor(client, mock_db, sample_paper):
+    """Test keyset pagination round-trips the cursor"""
+    created_at = datetime.datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+    mock_db.paper_list_all.return_value = {
+        "papers": [sample_paper],
+        "total": 30,
+        "page": 2,
+        "total_pages": 3,
+        "next_cursor": (created_at, sample_paper["id"]),
+    }
+
+    response = client.get("/papers?page=1&page_size=10")
+    assert response.status_code == 200
+    next_cursor = response.json["next_cursor"]
+    assert "," not in next_cursor
+    assert next_cursor == quote(next_cursor)
+
+    client.get(f"/papers?page=2&page_size=10&cursor={next_cursor}")
+    mock_db.paper_list_all.assert_called_with(page=2, page_size=10, cursor=(created_at, sample_paper["id"]))
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor!",
+        base64.urlsafe_b64encode(b"2025-03-01T12:30:15+00:00,not-a-uuid").decode(),
+        base64.urlsafe_b64encode(b"yesterday,7c9e6679-7425-40de-944b-e07fc1f90ae7").decode(),
+    ],
+)
+def test_list_papers_invalid_cursor(client, mock_db, cursor):
+    """Test that a malformed cursor is rejected instead of silently restarting the listing"""
+    response = client.get(f"/papers?cursor={quote(cursor)}")
+
+    assert response.status_code == 400
+    assert "error" in response.json
+    mock_db.paper_list_all.assert_not_called()
+
+
 def test_list_papers_embedding_error(client, mock_db, mock_ollama):
     """Test listing papers when embedding retrieval fails"""
     mock_ollama.get_query_embeddings.return_value = [0.1, 0.2, 0.3]
@@ -242,7 +284,7 @@ def test_list_papers_invalid_page(client, mock_db):
     mock_db.paper_list_all.return_value = {"papers": [], "total": 0, "page": 1, "total_pages": 1}
     response = client.get("/papers?page=0&page_size=10")
     assert response.status_code == 200  # Default to page 1
-    mock_db.paper_list_all.assert_called_with(page=1, page_size=10)
+    mock_db.paper_list_all.assert_called_with(page=1, page_size=10, cursor=None)
 
 
 def test_list_papers_invalid_page_size(client, mock_db):
@@ -250,7 +292,7 @@ def test_list_papers_invalid_page_size(client, mock_db):
     mock_db.paper_list_all.return_value = {"papers": [], "total": 0, "page": 1, "total_pages": 1}
     response = client.get("/papers?page=1&page_size=0")
     assert response.status_code == 200  # Default to page_size 1
-    mock_db.paper_list_all.assert_called_with(page=1, page_size=1)
+    mock_db.paper_list_all.assert_called_with(page=1, page_size=1, cursor=None)
 
 
 def test_list_papers_empty_query(client, mock_db):
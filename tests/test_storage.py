@@ -4,10 +4,12 @@ import botocore.exceptions
 from unittest.mock import patch
 from modules.storage.storage import (
     upload_file,
+    upload_bytes,
     download_file,
     delete_file,
     S3UploadError,
     S3DownloadError,
+    TRANSFER_CONFIG,
 )
 
 # Test data
@@ -36,28 +38,52 @@ def test_upload_file_success(mock_s3_client, test_file):
     """Test successful file upload"""
     url = upload_file(test_file)
 
-    mock_s3_client.upload_file.assert_called_once()
+    mock_s3_client.upload_fileobj.assert_called_once()
+    assert mock_s3_client.upload_fileobj.call_args.kwargs["Config"] is TRANSFER_CONFIG
     assert url.startswith("http://localhost:9000/papers/")
     assert url.endswith("/test.pdf")
 
 
 def test_upload_file_error(mock_s3_client, test_file):
     """Test file upload with S3 error"""
-    mock_s3_client.upload_file.side_effect = botocore.exceptions.ClientError(
-        error_response={"Error": {"Code": "500", "Message": "S3 error"}}, operation_name="upload_file"
+    mock_s3_client.upload_fileobj.side_effect = botocore.exceptions.ClientError(
+        error_response={"Error": {"Code": "500", "Message": "S3 error"}}, operation_name="upload_fileobj"
     )
 
     with pytest.raises(S3UploadError):
         upload_file(test_file)
 
 
+def test_upload_file_error_not_retried_again(mock_s3_client, test_file):
+    """Test that a failed upload is not retried on top of the client's own retries"""
+    mock_s3_client.upload_fileobj.side_effect = botocore.exceptions.EndpointConnectionError(endpoint_url="http://localhost:9000")
+
+    with pytest.raises(S3UploadError):
+        upload_file(test_file)
+
+    mock_s3_client.upload_fileobj.assert_called_once()
+
+
+def test_upload_bytes_success(mock_s3_client):
+    """Test uploading in-memory content with a CRC32 checksum"""
+    uploaded = []
+    mock_s3_client.upload_fileobj.side_effect = lambda fileobj, *args, **kwargs: uploaded.append(fileobj.read())
+
+    url = upload_bytes(b"test content", "test.pdf")
+
+    assert uploaded == [b"test content"]
+    assert mock_s3_client.upload_fileobj.call_args.kwargs["ExtraArgs"] == {"ChecksumAlgorithm": "CRC32"}
+    assert url.startswith("http://localhost:9000/papers/")
+    assert url.endswith("/test.pdf")
+
+
 def test_download_file_success(mock_s3_client):
     """Test successful file download"""
     destination = "downloaded_test.pdf"
     try:
         download_file(TEST_FILE_URL, destination)
 
-        mock_s3_client.download_file.assert_called_once_with(TEST_BUCKET, "123/test.pdf", destination)
+        mock_s3_client.download_file.assert_called_once_with(TEST_BUCKET, "123/test.pdf", destination, Config=TRANSFER_CONFIG)
     finally:
         if os.path.exists(destination):
             os.remove(destination)